@@ -1,10 +1,27 @@
+import csv
+from itertools import chain
+
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 
-from .models import Category, Comment, Location, Post
+from . import deletion
+from .const import STREAM_CHUNK_SIZE
+from .models import Category, Comment, Location, Post, StoredImage, User
 
 admin.site.empty_value_display = 'Не задано'
 
 
+class Echo:
+    """Файлоподобный объект для csv.writer, возвращающий строку
+    вместо записи, чтобы выгрузку можно было отдавать потоком.
+    """
+
+    def write(self, value):
+        return value
+
+
 class PostInline(admin.StackedInline):
     model = Post
     extra = 1
@@ -41,6 +58,22 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('author',)
     list_display_links = ('text',)
+    raw_id_fields = ('parent',)
+    actions = ('export_csv',)
+
+    @admin.action(description='Выгрузить в CSV')
+    def export_csv(self, request, queryset):
+        writer = csv.writer(Echo())
+        header = ('id', 'post_id', 'author', 'created_at', 'text')
+        rows = queryset.order_by('pk').values_list(
+            'id', 'post_id', 'author__username', 'created_at', 'text'
+        ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in chain([header], rows)),
+            content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = (
+            'attachment; filename="comments.csv"')
+        return response
 
 
 class LocationAdmin(admin.ModelAdmin):
@@ -78,7 +111,49 @@ class PostAdmin(admin.ModelAdmin):
     list_display_links = ('title',)
 
 
+class UserAdmin(BaseUserAdmin):
+    """Удаляет пользователей быстрым путём: публикации и комментарии
+    пачками запросов, без загрузки их в память.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        # Вместо перечня каждого связанного объекта — только их число.
+        users = list(objs)
+        model_count = {
+            User._meta.verbose_name_plural: len(users),
+            Post._meta.verbose_name_plural: Post.objects.filter(
+                author__in=users).count(),
+            Comment._meta.verbose_name_plural: Comment.objects.filter(
+                Q(author__in=users) | Q(post__author__in=users)).count(),
+        }
+        perms_needed = {
+            model._meta.verbose_name for model in (User, Post, Comment)
+            if not request.user.has_perm(
+                f'{model._meta.app_label}.delete_{model._meta.model_name}')
+        }
+        return [str(user) for user in users], model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        deletion.delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            deletion.delete_user(user)
+
+
+class StoredImageAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'references',
+        'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'references')
+
+
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
+admin.site.register(StoredImage, StoredImageAdmin)
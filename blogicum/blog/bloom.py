@@ -0,0 +1,185 @@
+import hashlib
+import math
+import threading
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import Http404
+
+from .const import BLOOM_ERROR_RATE, BLOOM_MIN_CAPACITY, LOOKUP_CACHE_TIMEOUT
+from .models import Category, Post, User
+
+
+class BloomFilter:
+    """Вероятностное множество: ложные срабатывания возможны,
+    пропуски — нет.
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for number in range(self.hash_count):
+            yield (first + number * second) % self.size
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+class SharedMembership:
+    """Фильтр Блума допустимых значений, общий для процессов.
+
+    Каждый процесс строит фильтр из базы при первом обращении. Новые
+    значения добавляются в локальный фильтр и в журнал добавлений
+    в общем кэше; прежде чем ответить «нет», процесс догоняет журнал.
+    Удаления не отслеживаются: лишние значения дают лишь ложные
+    срабатывания, которые проверит запрос к базе.
+
+    Если журнал отстал или потерял записи, процесс перестраивает
+    фильтр из базы. Строки, добавленные мимо сигналов (bulk_create,
+    миграции), требуют reset(): он сдвигает эпоху фильтра, и все
+    процессы перестраивают его при следующем отказе.
+    """
+
+    def __init__(self, namespace, load_members):
+        self.namespace = namespace
+        self.load_members = load_members
+        self._filter = None
+        self._seen = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    @property
+    def sequence_key(self):
+        return f'bloom:{self.namespace}:sequence'
+
+    @property
+    def epoch_key(self):
+        return f'bloom:{self.namespace}:epoch'
+
+    def _addition_key(self, number):
+        return f'bloom:{self.namespace}:add:{number}'
+
+    def rebuild(self):
+        cache.add(self.sequence_key, 0, None)
+        cache.add(self.epoch_key, 0, None)
+        state = cache.get_many([self.sequence_key, self.epoch_key])
+        members = list(self.load_members())
+        bloom = BloomFilter(max(BLOOM_MIN_CAPACITY, 2 * len(members)))
+        for member in members:
+            bloom.add(member)
+        with self._lock:
+            self._filter = bloom
+            self._seen = state.get(self.sequence_key, 0)
+            self._epoch = state.get(self.epoch_key, 0)
+
+    def reset(self):
+        """Перестраивает фильтры всех процессов при следующем отказе."""
+        cache.add(self.epoch_key, 0, None)
+        try:
+            cache.incr(self.epoch_key)
+        except ValueError:
+            pass
+        self._filter = None
+
+    def _ensure(self):
+        if self._filter is None:
+            self.rebuild()
+
+    def _sync(self):
+        state = cache.get_many([self.sequence_key, self.epoch_key])
+        sequence = state.get(self.sequence_key)
+        if (sequence is None or sequence < self._seen
+                or state.get(self.epoch_key) != self._epoch):
+            self.rebuild()
+            return
+        if sequence == self._seen:
+            return
+        keys = [self._addition_key(number)
+                for number in range(self._seen + 1, sequence + 1)]
+        additions = cache.get_many(keys)
+        if len(additions) < len(keys):
+            self.rebuild()
+            return
+        with self._lock:
+            for member in additions.values():
+                self._filter.add(member)
+            self._seen = max(self._seen, sequence)
+        if self._filter.count > self._filter.capacity:
+            self.rebuild()
+
+    def add(self, member):
+        # Ещё не построенный фильтр прочитает значение из базы.
+        if self._filter is not None:
+            with self._lock:
+                self._filter.add(member)
+        cache.add(self.sequence_key, 0, None)
+        try:
+            number = cache.incr(self.sequence_key)
+        except ValueError:
+            self.rebuild()
+            return
+        cache.set(self._addition_key(number), member, LOOKUP_CACHE_TIMEOUT)
+
+    def might_contain(self, member):
+        self._ensure()
+        if member in self._filter:
+            return True
+        self._sync()
+        return member in self._filter
+
+
+category_slugs = SharedMembership(
+    'category_slugs',
+    lambda: Category.objects.values_list('slug', flat=True).iterator())
+usernames = SharedMembership(
+    'usernames',
+    lambda: User.objects.values_list('username', flat=True).iterator())
+post_ids = SharedMembership(
+    'post_ids',
+    lambda: Post.objects.values_list('pk', flat=True).iterator())
+
+
+def require_member(membership, kwarg):
+    """404 без обращения к базе, если значения заведомо нет."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not membership.might_contain(kwargs[kwarg]):
+                raise Http404
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+MEMBERSHIPS = (category_slugs, usernames, post_ids)
+
+
+def rebuild_all():
+    for membership in MEMBERSHIPS:
+        membership.rebuild()
+
+
+def reset_all():
+    """Для строк, добавленных мимо сигналов: после миграций
+    и пакетной загрузки.
+    """
+    for membership in MEMBERSHIPS:
+        membership.reset()
@@ -0,0 +1,35 @@
+from collections import namedtuple
+
+from . import dependencies
+from .const import STREAM_CHUNK_SIZE
+
+CommentAuthor = namedtuple('CommentAuthor', 'username')
+
+# Лёгкая замена экземпляра Comment для шаблонов: только нужные поля
+CommentRow = namedtuple(
+    'CommentRow',
+    'id author_id author created_at text text_html depth reply_links',
+    defaults=((),))
+
+ROW_FIELDS = ('id', 'author_id', 'author__username', 'created_at', 'text',
+              'text_html', 'depth')
+
+
+def comment_rows(comments, chunk_size=STREAM_CHUNK_SIZE):
+    """Комментарии одной выборкой, читаемой пачками по chunk_size:
+    без кэша результатов queryset и без экземпляров моделей, поэтому
+    память не растёт с числом комментариев.
+    """
+    rows = comments.values_list(*ROW_FIELDS).iterator(chunk_size=chunk_size)
+    for pk, author_id, username, created_at, text, text_html, depth in rows:
+        dependencies.record(f'comment:{pk}', f'user:{author_id}')
+        yield CommentRow(pk, author_id, CommentAuthor(username), created_at,
+                         text, text_html, depth)
+
+
+def with_reply_links(rows, links):
+    """Добавляет к строкам ссылки на непоказанные ответы из threads.page."""
+    for row in rows:
+        if row.id in links:
+            row = row._replace(reply_links=links[row.id])
+        yield row
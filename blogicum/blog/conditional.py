@@ -0,0 +1,126 @@
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.utils.timezone import now
+from django.views.decorators.http import condition
+
+from .counters import get_counter
+from .dependencies import feed_tag, record
+from .lookup_cache import category_by_slug, user_by_username
+from .models import FeedCounter, Post
+from .posts_utils import page_number
+
+
+def category_id_by_slug(category_slug):
+    category = category_by_slug(category_slug)
+    if category is not None and category.is_published:
+        return category.pk
+
+
+def author_id_by_username(username):
+    author = user_by_username(username)
+    if author is not None:
+        return author.pk
+
+
+def request_counter(request, scope, object_id=0):
+    """Счётчик ленты, запоминаемый на время обработки запроса."""
+    memo = request.__dict__.setdefault('_feed_counters', {})
+    record(feed_tag(scope, object_id))
+    if (scope, object_id) not in memo:
+        memo[(scope, object_id)] = get_counter(scope, object_id)
+    return memo[(scope, object_id)]
+
+
+def _scope_counter(request, scope, lookup, kwargs):
+    memo = request.__dict__.setdefault('_scope_object_ids', {})
+    key = (scope, tuple(sorted(kwargs.items())))
+    if key not in memo:
+        memo[key] = lookup(**kwargs) if lookup else 0
+    object_id = memo[key]
+    if object_id is not None:
+        return request_counter(request, scope, object_id)
+
+
+def _timestamp(value):
+    return int(value.timestamp() * 1000)
+
+
+def revalidate(view):
+    """Разрешает хранить ответ, но требует его перепроверки по ETag;
+    страницы авторизованных пользователей не попадают в общие кэши.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    return wrapper
+
+
+def feed_condition(scope, lookup=None):
+    """Условный GET для RSS/Atom: ETag и Last-Modified берутся
+    из счётчика ленты, поэтому 304 отдаётся без выборки постов.
+    """
+
+    def etag(request, **kwargs):
+        counter = _scope_counter(request, scope, lookup, kwargs)
+        if counter is not None:
+            return f'{scope}-{counter.object_id}-{counter.generation}'
+
+    def last_modified(request, **kwargs):
+        counter = _scope_counter(request, scope, lookup, kwargs)
+        if counter is not None:
+            return counter.changed_at
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def listing_condition(scope, lookup=None):
+    """Условный GET для HTML-лент: поколение ленты, номер страницы
+    и пользователь, для которого отрисована шапка.
+    """
+
+    def etag(request, **kwargs):
+        counter = _scope_counter(request, scope, lookup, kwargs)
+        if counter is None:
+            return None
+        # Автор видит в своём профиле и неопубликованные посты.
+        own = (scope == FeedCounter.AUTHOR
+               and counter.object_id == request.user.pk)
+        page = page_number(request, counter.total if own
+                           else counter.published)
+        return (f'{scope}-{counter.object_id}-{counter.generation}-'
+                f'p{page}-u{request.user.pk or 0}')
+
+    def decorator(view):
+        return revalidate(condition(etag_func=etag)(view))
+
+    return decorator
+
+
+def post_etag(request, post_id):
+    state = Post.objects.filter(pk=post_id).values(
+        'updated_at',
+        'comments_generation',
+        'is_published',
+        'pub_date',
+        'category__is_published',
+    ).first()
+    if state is None:
+        return None
+    visible = bool(state['is_published']
+                   and state['category__is_published']
+                   and state['pub_date'] <= now())
+    return (f'post-{post_id}-{_timestamp(state["updated_at"])}-'
+            f'{state["comments_generation"]}-{int(visible)}-'
+            f'u{request.user.pk or 0}')
+
+
+def post_condition(view):
+    return revalidate(condition(etag_func=post_etag)(view))
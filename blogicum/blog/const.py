@@ -6,3 +6,91 @@ NAME_LENGTH_LIMIT = 20
 
 # Константин для пагинатора-количество записей на странице
 QUANTITY_PER_PAGE = 10
+
+# Количество публикаций в RSS/Atom-лентах
+QUANTITY_PER_FEED = 20
+
+# Защита кэша страниц от одновременного пересчёта:
+# время жизни блокировки, сколько хранить устаревшую страницу,
+# сколько ждать чужого пересчёта и коэффициент раннего обновления
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60
+PAGE_CACHE_LOCK_WAIT = 5
+PAGE_CACHE_EARLY_REFRESH_BETA = 1.0
+
+# Двухуровневый кэш категорий, местоположений и авторов:
+# размер кэша процесса, как часто сверять поколение с общим кэшем (с)
+# и время жизни записей в общем кэше (с)
+LOOKUP_CACHE_L1_SIZE = 1024
+LOOKUP_CACHE_L1_TTL = 5
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+
+# Фильтр Блума существующих слагов, имён пользователей и id постов:
+# допустимая доля ложных срабатываний и минимальная ёмкость
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1024
+
+# Сколько хранить граф зависимостей страниц от объектов (с)
+DEPENDENCIES_TIMEOUT = 60 * 60 * 24
+
+# Сколько страниц запоминать за одним тегом до его сброса: ?page=N
+# лент иначе растят граф без предела
+DEPENDENCIES_MAX_PAGES = 1000
+
+# Сброс кэша прокси: сколько тегов отправлять в одном запросе
+# и сколько ждать ответа (с)
+PURGE_BATCH_SIZE = 256
+PURGE_TIMEOUT = 5
+
+# Предельная длина заголовка Surrogate-Key: прокси отбрасывают
+# заголовки длиннее 8–16 КБ
+SURROGATE_KEY_MAX_LENGTH = 4096
+
+# Сколько комментариев отрисовывать за раз при потоковой отдаче страницы
+STREAM_CHUNK_SIZE = 100
+
+# Дерево комментариев: ширина сегмента материализованного пути
+# (номер комментария с ведущими нулями), предельная глубина ответов
+# и сколько веток одного уровня показывать за раз
+COMMENT_PATH_STEP = 10
+COMMENT_MAX_DEPTH = 5
+COMMENT_THREADS_PER_PAGE = 50
+
+# Сколько первых ответов показывать под каждой ветвью; остальные
+# ответы открываются ссылкой на страницу уровня
+COMMENT_REPLIES_PER_PARENT = 3
+
+# Сколько строк удалять одним запросом при удалении публикаций
+# и пользователей с большим числом комментариев
+DELETE_BATCH_SIZE = 500
+
+# Пауза между пачками фоновой очистки мягко удалённых записей (с)
+PURGE_DELETED_PAUSE = 0.5
+
+# Сборка мусора в каталоге картинок: не трогать файлы моложе этого
+# срока (с) — их публикация может быть ещё не сохранена — и сколько
+# файлов перепроверять и удалять за раз
+MEDIA_GC_GRACE = 60 * 60
+MEDIA_GC_BATCH_SIZE = 500
+
+# Сколько хранить медиафайлы в кэшах браузеров и прокси (с): файлы
+# с именем из хэша содержимого не меняются, остальные могут быть
+# перезаписаны под тем же именем
+MEDIA_MAX_AGE = 60 * 60
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Размытая миниатюра картинки публикации, которую браузер показывает
+# до загрузки самой картинки: наибольшая сторона (px) и качество JPEG
+IMAGE_PLACEHOLDER_SIZE = 16
+IMAGE_PLACEHOLDER_QUALITY = 40
+
+# Загрузка картинок публикаций: наибольший размер файла (байт),
+# наибольшая сторона и площадь (px), сколько байт начала файла ждать
+# разбора заголовка, качество JPEG при перекодировании и сколько
+# картинок перекодировать одновременно
+IMAGE_UPLOAD_MAX_SIZE = 10 * 2 ** 20
+IMAGE_MAX_SIDE = 8000
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_HEADER_LIMIT = 256 * 2 ** 10
+IMAGE_JPEG_QUALITY = 85
+IMAGE_REENCODE_WORKERS = 2
@@ -0,0 +1,238 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils.timezone import now
+
+from .models import FeedCounter, Post
+from .posts_utils import published_posts_q
+
+
+def post_scopes(author_id, category_id):
+    """Ленты, в которые попадает публикация."""
+    scopes = [(FeedCounter.GLOBAL, 0), (FeedCounter.AUTHOR, author_id)]
+    if category_id is not None:
+        scopes.append((FeedCounter.CATEGORY, category_id))
+    return scopes
+
+
+def pending_posts_q():
+    """Отложенные публикации, которые ещё не вышли в ленту."""
+    return Q(is_counted=False,
+             is_published=True,
+             category__is_published=True,
+             pub_date__gt=now())
+
+
+def is_visible(post):
+    category = post.category if post.category_id is not None else None
+    return bool(post.is_published
+                and post.deleted_at is None
+                and category is not None
+                and category.is_published
+                and post.pub_date <= now())
+
+
+def _scope_filter(scope, object_id):
+    if scope == FeedCounter.CATEGORY:
+        return Q(category_id=object_id)
+    if scope == FeedCounter.AUTHOR:
+        return Q(author_id=object_id)
+    return Q()
+
+
+def recount(scope, object_id=0):
+    """Пересчитывает одну ленту по флагам is_counted публикаций."""
+    posts = Post.objects.filter(_scope_filter(scope, object_id))
+    values = posts.aggregate(
+        total=Count('pk'),
+        published=Count('pk', filter=Q(is_counted=True)),
+    )
+    if scope == FeedCounter.GLOBAL:
+        values['next_go_live'] = Post.objects.filter(
+            pending_posts_q()
+        ).aggregate(next_go_live=Min('pub_date'))['next_go_live']
+    values['changed_at'] = now()
+    updated = FeedCounter.objects.filter(
+        scope=scope, object_id=object_id
+    ).update(generation=F('generation') + 1, **values)
+    if not updated:
+        try:
+            with transaction.atomic():
+                FeedCounter.objects.create(
+                    scope=scope, object_id=object_id, **values)
+        except IntegrityError:
+            pass
+    return FeedCounter.objects.get(scope=scope, object_id=object_id)
+
+
+def apply_deltas(published=None, total=None):
+    """Применяет приращения к счётчикам и сдвигает поколение лент;
+    отсутствующие строки пересчитываются целиком.
+    """
+    published = published or Counter()
+    total = total or Counter()
+    changed_at = now()
+    for key in set(published) | set(total):
+        scope, object_id = key
+        updated = FeedCounter.objects.filter(
+            scope=scope, object_id=object_id
+        ).update(published=F('published') + published[key],
+                 total=F('total') + total[key],
+                 generation=F('generation') + 1,
+                 changed_at=changed_at)
+        if not updated:
+            recount(scope, object_id)
+
+
+def touch(keys):
+    """Сдвигает поколение лент без изменения счётчиков."""
+    for scope, object_id in keys:
+        FeedCounter.objects.filter(
+            scope=scope, object_id=object_id
+        ).update(generation=F('generation') + 1, changed_at=now())
+
+
+def touch_all():
+    """Сдвигает поколение всех лент, например после переименования
+    категории, местоположения или автора.
+    """
+    FeedCounter.objects.update(generation=F('generation') + 1,
+                               changed_at=now())
+
+
+def schedule_go_live(pub_date):
+    updated = FeedCounter.objects.filter(
+        Q(next_go_live__isnull=True) | Q(next_go_live__gt=pub_date),
+        scope=FeedCounter.GLOBAL, object_id=0,
+    ).update(next_go_live=pub_date)
+    if not updated and not FeedCounter.objects.filter(
+            scope=FeedCounter.GLOBAL, object_id=0).exists():
+        recount(FeedCounter.GLOBAL)
+
+
+def post_changed(post, old=None):
+    """Учитывает создание или изменение публикации.
+
+    old — словарь с author_id, category_id и is_counted до сохранения.
+    """
+    visible = is_visible(post)
+    published, total = Counter(), Counter()
+    if old is not None:
+        for key in post_scopes(old['author_id'], old['category_id']):
+            total[key] -= 1
+            published[key] -= old['is_counted']
+    for key in post_scopes(post.author_id, post.category_id):
+        total[key] += 1
+        published[key] += visible
+    if visible != post.is_counted:
+        Post.objects.filter(pk=post.pk).update(is_counted=visible)
+        post.is_counted = visible
+    apply_deltas(published, total)
+    if (not visible and post.is_published and post.category_id is not None
+            and post.category.is_published):
+        schedule_go_live(post.pub_date)
+
+
+def post_deleted(post):
+    published, total = Counter(), Counter()
+    for key in post_scopes(post.author_id, post.category_id):
+        total[key] -= 1
+        published[key] -= post.is_counted
+    apply_deltas(published, total)
+
+
+def promote_due_posts():
+    """Включает в счётчики отложенные публикации, время которых пришло."""
+    due = Post.objects.filter(published_posts_q(), is_counted=False)
+    rows = list(due.values_list('pk', 'author_id', 'category_id'))
+    if rows:
+        updated = Post.objects.filter(
+            pk__in=[pk for pk, _, _ in rows], is_counted=False
+        ).update(is_counted=True)
+        published = Counter()
+        for _, author_id, category_id in rows:
+            for key in post_scopes(author_id, category_id):
+                published[key] += 1
+        if updated == len(rows):
+            apply_deltas(published)
+        else:
+            for scope, object_id in published:
+                recount(scope, object_id)
+    return recount(FeedCounter.GLOBAL)
+
+
+def get_counter(scope, object_id=0):
+    """Счётчик ленты за один индексированный запрос; попутно включает
+    в счётчики наступившие отложенные публикации.
+    """
+    counters = {
+        (counter.scope, counter.object_id): counter
+        for counter in FeedCounter.objects.filter(
+            Q(scope=FeedCounter.GLOBAL, object_id=0)
+            | Q(scope=scope, object_id=object_id)
+        )
+    }
+    global_counter = counters.get((FeedCounter.GLOBAL, 0))
+    if global_counter is None or (
+            global_counter.next_go_live is not None
+            and global_counter.next_go_live <= now()):
+        counters[(FeedCounter.GLOBAL, 0)] = promote_due_posts()
+        counters[(scope, object_id)] = FeedCounter.objects.filter(
+            scope=scope, object_id=object_id).first()
+    counter = counters.get((scope, object_id))
+    if counter is None:
+        counter = recount(scope, object_id)
+    return counter
+
+
+def feed_count(scope, object_id=0, published=True):
+    counter = get_counter(scope, object_id)
+    return counter.published if published else counter.total
+
+
+def reconcile(posts=None):
+    """Приводит флаги is_counted в соответствие с предикатом публикации
+    и пересчитывает затронутые ленты. Без аргумента — все ленты.
+    """
+    scoped = posts is not None
+    posts = Post.objects.all() if posts is None else posts
+    visible = published_posts_q()
+    posts.filter(visible).filter(is_counted=False).update(is_counted=True)
+    posts.filter(~visible).filter(is_counted=True).update(is_counted=False)
+    if scoped:
+        keys = {(FeedCounter.GLOBAL, 0)}
+        for author_id, category_id in posts.values_list(
+                'author_id', 'category_id').order_by().distinct():
+            keys.update(post_scopes(author_id, category_id))
+        for scope, object_id in keys:
+            recount(scope, object_id)
+        return len(keys)
+    # Поколения продолжают расти, чтобы старые ETag не совпали с новыми.
+    generations = {
+        (scope, object_id): generation + 1
+        for scope, object_id, generation in FeedCounter.objects.values_list(
+            'scope', 'object_id', 'generation')
+    }
+    counters = [FeedCounter(
+        scope=FeedCounter.GLOBAL, object_id=0,
+        generation=generations.get((FeedCounter.GLOBAL, 0), 0))]
+    for scope, field in ((FeedCounter.CATEGORY, 'category_id'),
+                         (FeedCounter.AUTHOR, 'author_id')):
+        rows = Post.objects.exclude(
+            **{f'{field}__isnull': True}
+        ).order_by().values(field).annotate(
+            total=Count('pk'),
+            published=Count('pk', filter=Q(is_counted=True)),
+        )
+        for row in rows:
+            counters.append(FeedCounter(scope=scope, object_id=row[field],
+                                        published=row['published'],
+                                        total=row['total'],
+                                        generation=generations.get(
+                                            (scope, row[field]), 0)))
+    with transaction.atomic():
+        FeedCounter.objects.all().delete()
+        FeedCounter.objects.bulk_create(counters)
+    recount(FeedCounter.GLOBAL)
+    return len(counters)
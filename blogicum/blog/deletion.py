@@ -0,0 +1,171 @@
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from . import counters, dependencies, image_refs
+from .const import DELETE_BATCH_SIZE, PURGE_DELETED_PAUSE
+from .models import Comment, FeedCounter, Post
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _raw_delete(model, pks):
+    queryset = model.all_objects.filter(pk__in=pks)
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_in_batches(queryset, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет строки запросом на пачку, не загружая объекты и без
+    сигналов. Пачки идут от новых строк к старым: ответ всегда новее
+    комментария, на который отвечает, поэтому удалённые раньше строки
+    не остаются родителями.
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by('-pk').values_list(
+            'pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        deleted += _raw_delete(queryset.model, pks)
+
+
+def comments_changed(post_ids):
+    """То же, что сигналы изменения комментария, для многих постов."""
+    post_ids = list(post_ids)
+    Post.all_objects.filter(pk__in=post_ids).update(
+        comments_generation=F('comments_generation') + 1)
+    keys = set()
+    for author_id, category_id in Post.all_objects.filter(
+            pk__in=post_ids).values_list('author_id', 'category_id'):
+        keys.update(counters.post_scopes(author_id, category_id))
+    counters.touch(keys)
+    dependencies.invalidate_tags(
+        Comment, {f'post:{post_id}' for post_id in post_ids})
+
+
+def delete_comment_branches(comments, batch_size=DELETE_BATCH_SIZE,
+                            pause=0, notify=True):
+    """Удаляет комментарии вместе со всеми ответами на них, как это
+    сделал бы CASCADE по parent, но пачками запросов с паузой pause
+    секунд между ними. Возвращает число удалённых строк.
+    """
+    post_ids = set()
+    deleted = 0
+    while True:
+        rows = list(comments.order_by('-pk').values_list(
+            'pk', 'post_id')[:batch_size])
+        if not rows:
+            break
+        level = [pk for pk, _ in rows]
+        branches = set(level)
+        post_ids.update(post_id for _, post_id in rows)
+        while level:
+            level = [pk for batch in _batches(level, batch_size)
+                     for pk in Comment.all_objects.filter(
+                         parent_id__in=batch).values_list('pk', flat=True)]
+            branches.update(level)
+        for batch in _batches(sorted(branches, reverse=True), batch_size):
+            deleted += _raw_delete(Comment, batch)
+        time.sleep(pause)
+    if notify and post_ids:
+        comments_changed(post_ids)
+    return deleted
+
+
+def _delete_post_rows(pks, batch_size):
+    """Удаляет публикации с комментариями и снимает ссылки с их
+    картинок; возвращает имена этих картинок.
+    """
+    comments = Comment.all_objects.filter(post_id__in=pks)
+    delete_in_batches(comments, batch_size)
+    # Комментарии, добавленные после первого прохода, удаляются
+    # в одной транзакции с публикациями.
+    with transaction.atomic():
+        delete_in_batches(comments, batch_size)
+        images = list(Post.all_objects.filter(pk__in=pks).exclude(
+            image='').values_list('image', flat=True))
+        _raw_delete(Post, pks)
+        image_refs.release(images)
+    return images
+
+
+def delete_posts(posts, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет публикации с комментариями запросами на пачку строк.
+
+    Сборщик Django загрузил бы в память каждый комментарий; здесь
+    читаются только ключи. Затем пересчитываются затронутые ленты
+    и сбрасываются страницы, зависевшие от публикаций.
+    """
+    rows = list(posts.order_by().values_list(
+        'pk', 'author_id', 'category_id'))
+    keys = {(FeedCounter.GLOBAL, 0)}
+    tags = set()
+    for pks in _batches([pk for pk, _, _ in rows], batch_size):
+        image_refs.delete_unreferenced(_delete_post_rows(pks, batch_size))
+    for pk, author_id, category_id in rows:
+        scopes = counters.post_scopes(author_id, category_id)
+        keys.update(scopes)
+        tags.add(f'post:{pk}')
+        tags.update(dependencies.feed_tag(*scope) for scope in scopes)
+    for scope, object_id in keys:
+        counters.recount(scope, object_id)
+    dependencies.invalidate_tags(Post, tags)
+    return len(rows)
+
+
+def delete_user(user, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет пользователя: сначала его комментарии с ответами и его
+    публикации пачками, затем саму запись — сборщику остаётся немного.
+    """
+    delete_comment_branches(Comment.all_objects.filter(author=user),
+                            batch_size)
+    delete_posts(Post.all_objects.filter(author=user), batch_size)
+    user.delete()
+
+
+def soft_delete_post(post):
+    """Помечает публикацию удалённой одним UPDATE; строку вместе
+    с комментариями и картинкой позже удалит purge_deleted.
+    """
+    with transaction.atomic():
+        state = Post.objects.select_for_update().filter(
+            pk=post.pk).values('author_id', 'category_id',
+                               'is_counted').first()
+        if state is None:
+            return False
+        Post.objects.filter(pk=post.pk).update(deleted_at=now())
+        tombstone = Post(pk=post.pk, **state)
+        counters.post_deleted(tombstone)
+    dependencies.invalidate(tombstone)
+    return True
+
+
+def purge_deleted(batch_size=DELETE_BATCH_SIZE, pause=PURGE_DELETED_PAUSE,
+                  older_than=0):
+    """Физически удаляет помеченные публикации с комментариями
+    и картинками, затем помеченные комментарии. Пачки разделены
+    паузой pause секунд, чтобы очистка не занимала базу надолго.
+    Возвращает число удалённых публикаций и комментариев.
+    """
+    before = now() - timedelta(seconds=older_than)
+    posts = Post.all_objects.filter(deleted_at__lte=before)
+    purged_posts = 0
+    while True:
+        pks = list(posts.order_by('pk').values_list(
+            'pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        image_refs.delete_unreferenced(_delete_post_rows(pks, batch_size))
+        purged_posts += len(pks)
+        time.sleep(pause)
+    # Отметка уже сбросила страницы, повторно их трогать не нужно.
+    purged_comments = delete_comment_branches(
+        Comment.all_objects.filter(deleted_at__lte=before), batch_size,
+        pause=pause, notify=False)
+    return purged_posts, purged_comments
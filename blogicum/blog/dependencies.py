@@ -0,0 +1,182 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import Model
+from django.dispatch import Signal
+
+from .const import DEPENDENCIES_MAX_PAGES, DEPENDENCIES_TIMEOUT
+from .counters import post_scopes
+from .models import FeedCounter
+
+# Отправляется после изменения объекта со списком тегов и зависевших
+# от них страниц (ключей кэша страниц и адресов).
+pages_invalidated = Signal()
+
+_recorded = ContextVar('recorded_dependencies', default=None)
+
+# Огрублённый тег страниц, в заголовке которых не уместились теги
+# отдельных пользователей
+ALL_USERS_TAG = 'user:all'
+
+
+def model_tag(instance):
+    return f'{instance._meta.model_name}:{instance.pk}'
+
+
+def feed_tag(scope, object_id=0):
+    return f'feed:{scope}:{object_id}'
+
+
+def _generation_key(tag):
+    return f'deps:{tag}:generation'
+
+
+def _graph_key(tag, generation, suffix):
+    return f'deps:{tag}:{generation}:{suffix}'
+
+
+def _page_digest(page):
+    return hashlib.md5(page.encode()).hexdigest()
+
+
+def _generations(tags):
+    """Текущие поколения тегов; у новых тегов — 0."""
+    keys = {tag: _generation_key(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    generations = {}
+    for tag, key in keys.items():
+        if key not in found:
+            cache.add(key, 0, DEPENDENCIES_TIMEOUT)
+        generations[tag] = found.get(key, 0)
+    return generations
+
+
+def record(*tags):
+    """Отмечает теги как зависимости отрисовываемой страницы."""
+    recorded = _recorded.get()
+    if recorded is not None:
+        recorded.update(tags)
+
+
+def record_instance(instance):
+    if isinstance(instance, Model) and instance.pk is not None:
+        record(model_tag(instance))
+
+
+def current():
+    """Теги, записанные к этому моменту, или None вне записи."""
+    return _recorded.get()
+
+
+@contextmanager
+def recording():
+    """Собирает теги объектов, затронутых внутри блока; вложенная
+    запись передаёт свои теги внешней.
+    """
+    outer = _recorded.get()
+    tags = set()
+    token = _recorded.set(tags)
+    try:
+        yield tags
+    finally:
+        _recorded.reset(token)
+        if outer is not None:
+            outer.update(tags)
+
+
+def track(view):
+    """Записывает зависимости ответа в response.dependencies."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with recording() as tags:
+            response = view(request, *args, **kwargs)
+        response.dependencies = frozenset(tags)
+        return response
+
+    return wrapper
+
+
+def register(tags, *pages):
+    """Запоминает, что страницы pages зависят от тегов tags.
+
+    Каждая пара (тег, страница) — отдельный ключ в поколении тега:
+    отметка cache.add не даёт записать страницу дважды, а номер слота
+    из cache.incr — двум процессам затереть записи друг друга. Сброс
+    тега лишь сдвигает его поколение, старые ключи истекают сами.
+    Больше DEPENDENCIES_MAX_PAGES страниц на поколение тега
+    не запоминается: кэш страниц сверяет версии и без графа.
+    """
+    for tag, generation in _generations(tags).items():
+        for page in pages:
+            if not cache.add(_graph_key(tag, generation, _page_digest(page)),
+                             True, DEPENDENCIES_TIMEOUT):
+                continue
+            count_key = _graph_key(tag, generation, 'count')
+            cache.add(count_key, 0, DEPENDENCIES_TIMEOUT)
+            try:
+                slot = cache.incr(count_key)
+            except ValueError:
+                continue
+            if slot <= DEPENDENCIES_MAX_PAGES:
+                cache.set(_graph_key(tag, generation, slot), page,
+                          DEPENDENCIES_TIMEOUT)
+
+
+def pages_for(tags):
+    generations = _generations(tags)
+    counts = cache.get_many([_graph_key(tag, generation, 'count')
+                             for tag, generation in generations.items()])
+    slots = [
+        _graph_key(tag, generation, slot)
+        for tag, generation in generations.items()
+        for slot in range(1, min(
+            counts.get(_graph_key(tag, generation, 'count'), 0),
+            DEPENDENCIES_MAX_PAGES) + 1)
+    ]
+    return set(cache.get_many(slots).values())
+
+
+def changed_tags(instance):
+    """Теги, которые задевает изменение объекта."""
+    tags = {model_tag(instance)}
+    model_name = instance._meta.model_name
+    if model_name == 'post':
+        scopes = set(post_scopes(instance.author_id, instance.category_id))
+        old = getattr(instance, '_saved_state', None)
+        if old:
+            scopes.update(post_scopes(old['author_id'], old['category_id']))
+        tags.update(feed_tag(*scope) for scope in scopes)
+    elif model_name == 'comment':
+        tags.add(f'post:{instance.post_id}')
+    elif model_name == 'category':
+        tags.add(feed_tag(FeedCounter.CATEGORY, instance.pk))
+    elif model_name == 'user':
+        tags.add(feed_tag(FeedCounter.AUTHOR, instance.pk))
+        tags.add(ALL_USERS_TAG)
+    return tags
+
+
+def invalidate_tags(sender, tags):
+    """Удаляет из кэша страницы, зависевшие от тегов, и сообщает
+    о них получателям pages_invalidated; возвращает множество страниц.
+    """
+    pages = pages_for(tags)
+    cache.delete_many([page for page in pages if page.startswith('page:')])
+    for tag in tags:
+        key = _generation_key(tag)
+        cache.add(key, 0, DEPENDENCIES_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+    pages_invalidated.send(sender=sender, tags=tags, pages=pages)
+    return pages
+
+
+def invalidate(instance):
+    """Сбрасывает страницы, зависевшие от объекта."""
+    return invalidate_tags(type(instance), changed_tags(instance))
@@ -0,0 +1,132 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .bloom import category_slugs, require_member, usernames
+from .conditional import (author_id_by_username, category_id_by_slug,
+                          feed_condition)
+from .const import QUANTITY_PER_FEED
+from .dependencies import track
+from .models import Category, FeedCounter, Post, User
+from .posts_utils import posts_filtered_by_published
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        description = self.description
+        return description(obj) if callable(description) else description
+
+
+class PostsFeed(Feed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+    link = reverse_lazy('blog:index')
+
+    def get_posts(self, obj):
+        return Post.objects
+
+    def items(self, obj):
+        return posts_filtered_by_published(
+            self.get_posts(obj)
+        ).select_related(
+            'category',
+            'author'
+        ).order_by('-pub_date')[:QUANTITY_PER_FEED]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text_html or linebreaksbr(item.text)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_author_link(self, item):
+        return reverse('blog:profile',
+                       kwargs={'username': item.author.username})
+
+    def item_categories(self, item):
+        return (item.category.title,)
+
+
+class CategoryPostsFeed(PostsFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category,
+            slug=category_slug,
+            is_published=True,
+        )
+
+    def get_posts(self, obj):
+        return obj.posts
+
+    def title(self, obj):
+        return f'Блогикум — {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts',
+                       kwargs={'category_slug': obj.slug})
+
+
+class AuthorPostsFeed(PostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, obj):
+        return obj.posts
+
+    def title(self, obj):
+        return f'Блогикум — @{obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', kwargs={'username': obj.username})
+
+
+class AtomPostsFeed(AtomFeedMixin, PostsFeed):
+    pass
+
+
+class AtomCategoryPostsFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AtomAuthorPostsFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
+
+
+def feed_view(feed, scope, lookup=None):
+    return track(feed_condition(scope, lookup)(feed))
+
+
+posts_rss = feed_view(PostsFeed(), FeedCounter.GLOBAL)
+posts_atom = feed_view(AtomPostsFeed(), FeedCounter.GLOBAL)
+category_rss = require_member(category_slugs, 'category_slug')(
+    feed_view(CategoryPostsFeed(), FeedCounter.CATEGORY,
+              category_id_by_slug))
+category_atom = require_member(category_slugs, 'category_slug')(
+    feed_view(AtomCategoryPostsFeed(), FeedCounter.CATEGORY,
+              category_id_by_slug))
+author_rss = require_member(usernames, 'username')(
+    feed_view(AuthorPostsFeed(), FeedCounter.AUTHOR, author_id_by_username))
+author_atom = require_member(usernames, 'username')(
+    feed_view(AtomAuthorPostsFeed(), FeedCounter.AUTHOR,
+              author_id_by_username))
@@ -0,0 +1,95 @@
+from django.db import models
+from django.template.defaultfilters import linebreaksbr
+
+from .image_meta import meta_for_file
+
+
+def render_text(text):
+    """HTML текста так, как его выводит {{ text|linebreaksbr }}."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+class RenderedHTMLField(models.TextField):
+    """HTML, заранее отрисованный из текстового поля source при
+    сохранении, чтобы не обрабатывать текст при каждом показе.
+    """
+
+    def __init__(self, *args, source='text', **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        for option, value in (('editable', False), ('blank', True),
+                              ('default', '')):
+            if option in kwargs and kwargs[option] == value:
+                del kwargs[option]
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = render_text(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class TombstoneField(models.DateTimeField):
+    """Время мягкого удаления; пустое значение — запись не удалена.
+    Помеченные строки физически удаляет фоновая очистка.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        for option in ('null', 'blank', 'db_index'):
+            if kwargs.get(option) is True:
+                del kwargs[option]
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+
+class ImageMetaField(models.JSONField):
+    """Размеры и размытая миниатюра картинки из поля source.
+    Считываются один раз, когда в source появляется новый файл,
+    чтобы шаблоны задавали размеры <img> без чтения файла.
+    """
+
+    def __init__(self, *args, source='image', **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', dict)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        for option, value in (('editable', False), ('blank', True),
+                              ('default', dict)):
+            if option in kwargs and kwargs[option] == value:
+                del kwargs[option]
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        image = getattr(model_instance, self.source)
+        value = getattr(model_instance, self.attname) or {}
+        if not image:
+            value = {}
+        elif value.get('name') != image.name:
+            try:
+                with image.open('rb') as file:
+                    value = meta_for_file(file, image.name)
+            except OSError:
+                value = {'name': image.name}
+        setattr(model_instance, self.attname, value)
+        return value
@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from .image_upload import sanitize
 from .models import User, Post, Comment
 
 
@@ -30,6 +32,22 @@ class PostForm(forms.ModelForm):
 
         }
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            return sanitize(image)
+        return image
+
+    def clean(self):
+        # Ошибки файлов, отклонённых ещё при загрузке (ImageUploadMixin).
+        for field, message in self.upload_errors.items():
+            self.add_error(field, message)
+        return super().clean()
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
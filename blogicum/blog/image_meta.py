@@ -0,0 +1,57 @@
+import base64
+from io import BytesIO
+
+from PIL import Image, ImageFilter, ImageOps
+
+from .const import IMAGE_PLACEHOLDER_QUALITY, IMAGE_PLACEHOLDER_SIZE
+
+# Значения EXIF Orientation, при которых браузер поворачивает
+# картинку на 90°: ширина и высота на странице меняются местами
+ROTATED = {5, 6, 7, 8}
+ORIENTATION_TAG = 0x0112
+
+
+def read_meta(file):
+    """Размеры картинки в том виде, в каком её покажет браузер,
+    и крошечная размытая копия в data: URI для фона до загрузки.
+
+    Читает только заголовок и уменьшенную при декодировании версию
+    (draft для JPEG), поэтому не распаковывает большие фотографии
+    целиком. file — путь или открытый файл.
+    """
+    with Image.open(file) as image:
+        width, height = image.size
+        if image.getexif().get(ORIENTATION_TAG) in ROTATED:
+            width, height = height, width
+        image.draft('RGB', (IMAGE_PLACEHOLDER_SIZE, IMAGE_PLACEHOLDER_SIZE))
+        preview = ImageOps.exif_transpose(image).convert('RGB')
+    preview.thumbnail((IMAGE_PLACEHOLDER_SIZE, IMAGE_PLACEHOLDER_SIZE))
+    preview = preview.filter(ImageFilter.GaussianBlur(1))
+    data = BytesIO()
+    preview.save(data, 'JPEG', quality=IMAGE_PLACEHOLDER_QUALITY)
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': ('data:image/jpeg;base64,'
+                        + base64.b64encode(data.getvalue()).decode()),
+    }
+
+
+def meta_for_file(file, name):
+    """Сведения о картинке name; для нечитаемого файла — только имя,
+    чтобы не пытаться прочитать его при каждом сохранении.
+    """
+    try:
+        meta = read_meta(file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        meta = {}
+    meta['name'] = name
+    return meta
+
+
+def meta_for_path(task):
+    """Задача пула процессов команды backfill_image_meta:
+    (pk, путь, имя) -> (pk, имя, сведения).
+    """
+    pk, path, name = task
+    return pk, name, meta_for_file(path, name)
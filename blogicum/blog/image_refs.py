@@ -0,0 +1,52 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .const import MEDIA_GC_GRACE
+from .models import Post, StoredImage
+from .storage import discard
+
+
+def retain(name):
+    """Учитывает ещё одну публикацию с картинкой name."""
+    if not name:
+        return
+    if StoredImage.objects.filter(name=name).update(
+            references=F('references') + 1):
+        return
+    try:
+        with transaction.atomic():
+            StoredImage.objects.create(name=name, references=1)
+    except IntegrityError:
+        StoredImage.objects.filter(name=name).update(
+            references=F('references') + 1)
+
+
+def release(names):
+    """Снимает по одной ссылке с каждой картинки из names."""
+    for name in names:
+        if name:
+            StoredImage.objects.filter(
+                name=name, references__gt=0
+            ).update(references=F('references') - 1)
+
+
+def delete_unreferenced(names, grace=MEDIA_GC_GRACE):
+    """Удаляет файлы из names, на которые не ссылается ни одна
+    публикация, вместе с их учётными записями; возвращает имена
+    удалённых файлов.
+
+    Файлы, загруженные повторно за последние grace секунд, остаются:
+    запись о новой ссылке на них может ещё не дойти до базы. Если она
+    так и не появится, файл уберёт сборка мусора gc_media.
+    """
+    storage = Post._meta.get_field('image').storage
+    candidates = set(filter(None, names))
+    with transaction.atomic():
+        candidates -= set(Post.all_objects.filter(
+            image__in=candidates).values_list('image', flat=True))
+        candidates -= set(StoredImage.objects.select_for_update().filter(
+            name__in=candidates, references__gt=0
+        ).values_list('name', flat=True))
+        StoredImage.objects.filter(name__in=candidates).delete()
+    return {name for name in candidates
+            if discard(storage.path(name), grace)}
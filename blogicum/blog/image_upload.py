@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from PIL import Image, ImageOps
+
+from .const import (IMAGE_HEADER_LIMIT, IMAGE_JPEG_QUALITY, IMAGE_MAX_PIXELS,
+                    IMAGE_MAX_SIDE, IMAGE_REENCODE_WORKERS,
+                    IMAGE_UPLOAD_MAX_SIZE)
+
+# Сигнатуры в начале файла и форматы, которые принимаются у картинок
+# публикаций; у WebP сигнатура разорвана размером файла
+MAGIC = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+# Метаданные, которые Pillow переносит из image.info в сохранённый
+# файл; прозрачность и остальное, нужное для отрисовки, остаются
+METADATA_KEYS = ('exif', 'comment', 'xmp', 'XML:com.adobe.xmp')
+
+FORMAT_ERROR = 'Загрузите картинку в формате JPEG, PNG, GIF или WebP.'
+SIZE_ERROR = (f'Размер файла не должен превышать '
+              f'{IMAGE_UPLOAD_MAX_SIZE // 2 ** 20} МБ.')
+DIMENSIONS_ERROR = (f'Картинка не должна быть больше {IMAGE_MAX_SIDE} '
+                    f'пикселей по каждой стороне.')
+
+_executor = None
+
+
+def sniff_format(head):
+    """Формат картинки по первым байтам файла или None."""
+    for magic, image_format in MAGIC:
+        if head.startswith(magic):
+            return image_format
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def check_image(image, expected_format=None):
+    """Проверяет формат и размеры открытой, но ещё не декодированной
+    картинки: Image.open читает только заголовок.
+    """
+    if image.format not in EXTENSIONS or (
+            expected_format and image.format != expected_format):
+        raise ValidationError(FORMAT_ERROR, code='invalid_image')
+    width, height = image.size
+    if (max(width, height) > IMAGE_MAX_SIDE
+            or width * height > IMAGE_MAX_PIXELS):
+        raise ValidationError(DIMENSIONS_ERROR, code='image_too_large')
+
+
+class PostImageUploadHandler(FileUploadHandler):
+    """Проверяет картинку публикации, пока она ещё загружается.
+
+    Сигнатура проверяется по первому блоку, формат и размеры —
+    по заголовку, как только он пришёл целиком, размер файла — на
+    каждом блоке. Негодный файл пропускается (SkipFile): остаток
+    запроса дочитывается без сохранения, уже принятые блоки
+    удаляются, а текст ошибки попадает в errors для формы. Годные
+    блоки передаются дальше стандартным обработчикам.
+
+    Обработчик нужно поставить до первого чтения request.POST,
+    то есть раньше проверки CSRF — см. ImageUploadMixin.
+    """
+
+    def __init__(self, request=None, field_name='image'):
+        super().__init__(request)
+        self.field_name = field_name
+        self.active = False
+        self.errors = {}
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.field_name
+        self.head = b''
+        self.checked = False
+
+    def reject(self, message):
+        self.errors[self.field_name] = message
+        raise SkipFile
+
+    def check_head(self, chunk):
+        if not self.head and sniff_format(chunk) is None:
+            self.reject(FORMAT_ERROR)
+        self.head += chunk
+        try:
+            with Image.open(BytesIO(self.head)) as image:
+                check_image(image, sniff_format(self.head))
+        except ValidationError as error:
+            self.reject(error.message)
+        except Image.DecompressionBombError:
+            self.reject(DIMENSIONS_ERROR)
+        except OSError:
+            # Заголовок ещё не пришёл целиком.
+            if len(self.head) >= IMAGE_HEADER_LIMIT:
+                self.reject(FORMAT_ERROR)
+            return
+        self.checked = True
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        if (start + len(raw_data) > IMAGE_UPLOAD_MAX_SIZE
+                or (self.content_length or 0) > IMAGE_UPLOAD_MAX_SIZE):
+            self.reject(SIZE_ERROR)
+        if not self.checked:
+            self.check_head(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Файл сохраняют следующие обработчики; короткий файл, заголовок
+        # которого так и не разобран, отклонит форма.
+        return None
+
+
+def reencode(file):
+    """Перекодирует картинку без EXIF и других метаданных, кроме
+    цветового профиля, предварительно повернув её по EXIF Orientation.
+    Анимированные картинки возвращаются как есть.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        check_image(image)
+        if getattr(image, 'is_animated', False):
+            file.seek(0)
+            return file
+        image_format = image.format
+        params = {}
+        if image.info.get('icc_profile'):
+            params['icc_profile'] = image.info['icc_profile']
+        upright = ImageOps.exif_transpose(image)
+    for key in METADATA_KEYS:
+        upright.info.pop(key, None)
+    if image_format == 'JPEG':
+        if upright.mode not in ('RGB', 'L', 'CMYK'):
+            upright = upright.convert('RGB')
+        params.update(quality=IMAGE_JPEG_QUALITY, optimize=True)
+    elif 'transparency' in upright.info:
+        params['transparency'] = upright.info['transparency']
+    output = BytesIO()
+    upright.save(output, image_format, **params)
+    # Расширение по формату: имя в хранилище сохраняет только его.
+    name = os.path.splitext(file.name)[0] + EXTENSIONS[image_format]
+    return SimpleUploadedFile(name, output.getvalue(),
+                              content_type=Image.MIME[image_format])
+
+
+def sanitize(file):
+    """Перекодирует загруженную картинку в пуле из
+    IMAGE_REENCODE_WORKERS потоков: Pillow отпускает GIL при
+    декодировании, а пул ограничивает число картинок, одновременно
+    распакованных в памяти.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(IMAGE_REENCODE_WORKERS,
+                                       thread_name_prefix='image-reencode')
+    return _executor.submit(reencode, file).result()
@@ -0,0 +1,58 @@
+from django.template.defaultfilters import linebreaksbr as linebreaksbr_filter
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import formats
+from django.utils.text import Truncator
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+from jinja2 import Environment, pass_context, pass_eval_context
+from markupsafe import Markup
+
+from .templatetags.holes import HOLE_MARKER, encode_hole
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args, kwargs=kwargs)
+
+
+def date(value, format_string=None):
+    """Фильтр date из шаблонов Django: местное время и формат
+    текущего языка.
+    """
+    if value in (None, ''):
+        return ''
+    return formats.date_format(template_localtime(value), format_string)
+
+
+def localize(value):
+    """Вывод значения так, как его показывает {{ value }} в Django."""
+    return formats.localize(template_localtime(value))
+
+
+def truncatewords(value, length):
+    return Truncator(value).words(int(length), truncate=' …')
+
+
+@pass_eval_context
+def linebreaksbr(eval_context, value):
+    return Markup(linebreaksbr_filter(value, eval_context.autoescape))
+
+
+@pass_context
+def hole(context, template_name, **values):
+    """Аналог {% hole %}: метка в скелете или шаблон Django на месте."""
+    if context.get('punch_holes'):
+        return Markup(HOLE_MARKER.format(encode_hole(template_name, values)))
+    return Markup(render_to_string(
+        template_name, {**context.get_all(), **values},
+        request=context.get('request')))
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update(url=url, static=static, hole=hole,
+                       bootstrap_css=bootstrap_css)
+    env.filters.update(date=date, localize=localize,
+                       truncatewords=truncatewords, linebreaksbr=linebreaksbr)
+    return env
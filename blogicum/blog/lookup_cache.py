@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from . import dependencies
+from .const import (LOOKUP_CACHE_L1_SIZE, LOOKUP_CACHE_L1_TTL,
+                    LOOKUP_CACHE_TIMEOUT)
+from .models import Category, Location, User
+
+MISSING = object()
+
+
+class TwoTierCache:
+    """Кэш редко меняющихся объектов.
+
+    L1 — ограниченный по размеру LRU в памяти процесса, L2 — общий кэш
+    Django. Согласованность между процессами держится на счётчике
+    поколения в L2: при изменении объекта поколение увеличивается,
+    и процессы, сверяющие его не реже раза в LOOKUP_CACHE_L1_TTL секунд,
+    перестают доверять своим копиям.
+
+    Чтение с verify=True сверяет поколение всегда: устаревшая копия
+    из L1 не должна попасть в закэшированный скелет страницы или ETag
+    под новой версией.
+    """
+
+    def __init__(self, namespace, max_entries=LOOKUP_CACHE_L1_SIZE,
+                 l1_ttl=LOOKUP_CACHE_L1_TTL, timeout=LOOKUP_CACHE_TIMEOUT):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.l1_ttl = l1_ttl
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ('l1_hits', 'l2_hits', 'misses', 'evictions', 'invalidations'),
+            0)
+
+    @property
+    def generation_key(self):
+        return f'lookup:{self.namespace}:generation'
+
+    def generation(self):
+        generation = cache.get(self.generation_key)
+        if generation is None:
+            cache.add(self.generation_key, time.time_ns(), None)
+            generation = cache.get(self.generation_key)
+        return generation
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _remember(self, key, value, generation):
+        with self._lock:
+            self._entries[key] = (value, generation, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get(self, key, load, verify=False):
+        """Объект по ключу; load() вызывается при промахе обоих уровней
+        и может вернуть None, если объекта нет. verify — сверить копию
+        из L1 с поколением в L2 (один cache.get) даже в пределах TTL.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            value, generation, checked_at = entry
+            if not verify and time.monotonic() - checked_at < self.l1_ttl:
+                self._count('l1_hits')
+                return self._result(value)
+        current = self.generation()
+        if entry is not None and entry[1] == current:
+            self._remember(key, entry[0], current)
+            self._count('l1_hits')
+            return self._result(entry[0])
+        l2_key = f'lookup:{self.namespace}:{current}:{key}'
+        value = cache.get(l2_key, MISSING)
+        if value is not MISSING:
+            self._count('l2_hits')
+        else:
+            self._count('misses')
+            loaded = load()
+            value = MISSING if loaded is None else loaded
+            cache.set(l2_key, value, self.timeout)
+        self._remember(key, value, current)
+        return self._result(value)
+
+    @staticmethod
+    def _result(value):
+        if value is MISSING:
+            return None
+        dependencies.record_instance(value)
+        return value
+
+    def invalidate(self):
+        """Сбрасывает L1 процесса и сдвигает общее поколение."""
+        try:
+            cache.incr(self.generation_key)
+        except ValueError:
+            cache.set(self.generation_key, time.time_ns(), None)
+        self.clear_local()
+        self._count('invalidations')
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries),
+                        max_entries=self.max_entries)
+
+
+categories = TwoTierCache('category')
+locations = TwoTierCache('location')
+users = TwoTierCache('user')
+
+# Объекты ниже попадают в скелеты страниц и ETag, поэтому функции
+# поиска всегда сверяют копии из L1 с поколением (verify=True).
+
+# Автору в шаблонах нужны только эти поля; хэш пароля в кэш не кладём.
+USER_FIELDS = ('id', 'username', 'first_name', 'last_name', 'is_staff',
+               'date_joined')
+
+
+def category_by_slug(slug):
+    return categories.get(
+        f'slug:{slug}', lambda: Category.objects.filter(slug=slug).first(),
+        verify=True)
+
+
+def category_by_id(pk):
+    return categories.get(
+        f'id:{pk}', lambda: Category.objects.filter(pk=pk).first(),
+        verify=True)
+
+
+def location_by_id(pk):
+    return locations.get(
+        f'id:{pk}', lambda: Location.objects.filter(pk=pk).first(),
+        verify=True)
+
+
+def user_by_username(username):
+    return users.get(
+        f'username:{username}',
+        lambda: User.objects.only(*USER_FIELDS).filter(
+            username=username).first(),
+        verify=True)
+
+
+def user_by_id(pk):
+    return users.get(
+        f'id:{pk}',
+        lambda: User.objects.only(*USER_FIELDS).filter(pk=pk).first(),
+        verify=True)
+
+
+def attach_related(post):
+    """Подставляет в пост категорию, местоположение и автора из кэша."""
+    if post.category_id is not None:
+        post.category = category_by_id(post.category_id)
+    if post.location_id is not None:
+        post.location = location_by_id(post.location_id)
+    post.author = user_by_id(post.author_id)
+    return post
+
+
+def stats():
+    """Статистика кэшей процесса для подбора размеров и TTL."""
+    return {lookup.namespace: lookup.stats()
+            for lookup in (categories, locations, users)}
+
+
+def clear_local():
+    for lookup in (categories, locations, users):
+        lookup.clear_local()
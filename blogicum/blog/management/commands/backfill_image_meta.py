@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog import counters, dependencies
+from blog.image_meta import meta_for_path
+from blog.models import Post
+
+# Сколько картинок отдавать пулу и записывать в базу за раз
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = ('Считывает размеры и размытые миниатюры картинок публикаций, '
+            'для которых их ещё нет, в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Перечитать сведения всех картинок.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Количество процессов.')
+
+    def save(self, results):
+        updated = []
+        with transaction.atomic():
+            for pk, name, meta in results:
+                # Картинку могли заменить, пока файл читался.
+                if Post.objects.filter(pk=pk, image=name).update(
+                        image_meta=meta, updated_at=now()):
+                    updated.append(pk)
+        self.notify(updated)
+        return len(updated)
+
+    def notify(self, pks):
+        """Сдвигает ленты и сбрасывает страницы с этими публикациями:
+        update() не вызывает сигналов.
+        """
+        keys, tags = set(), set()
+        for pk, author_id, category_id in Post.objects.filter(
+                pk__in=pks).values_list('pk', 'author_id', 'category_id'):
+            scopes = counters.post_scopes(author_id, category_id)
+            keys.update(scopes)
+            tags.add(f'post:{pk}')
+            tags.update(dependencies.feed_tag(*scope) for scope in scopes)
+        if keys:
+            counters.touch(keys)
+            dependencies.invalidate_tags(Post, tags)
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        rows = Post.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            rows = rows.exclude(image_meta__has_key='name')
+        rows = rows.values_list('pk', 'image')
+        updated, last_pk = 0, 0
+        with ProcessPoolExecutor(options['workers']) as pool:
+            while True:
+                batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+                if not batch:
+                    break
+                tasks = [(pk, storage.path(name), name)
+                         for pk, name in batch]
+                chunksize = max(1, len(tasks) // (options['workers'] * 4))
+                updated += self.save(
+                    pool.map(meta_for_path, tasks, chunksize=chunksize))
+                last_pk = batch[-1][0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлены сведения о {updated} картинках'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from blog.fields import render_text
+from blog.models import Comment, Post
+
+# Сколько записей обновлять одним запросом
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = ('Заполняет заранее отрисованный HTML текстов постов '
+            'и комментариев для записей, где его ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Перерисовать HTML всех записей.')
+
+    def backfill(self, model, everything):
+        rows = model.objects.order_by('pk').only('pk', 'text')
+        if not everything:
+            rows = rows.filter(text_html='').exclude(text='')
+        updated, last_pk = 0, 0
+        # Идём по первичному ключу пачками, не держа открытым курсор,
+        # пока обновляем ту же таблицу.
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                return updated
+            for row in batch:
+                row.text_html = render_text(row.text)
+            model.objects.bulk_update(batch, ['text_html'])
+            updated += len(batch)
+            last_pk = batch[-1].pk
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            updated = self.backfill(model, options['all'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'))
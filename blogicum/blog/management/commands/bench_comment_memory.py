@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.timezone import now
+
+from blog.comment_rows import comment_rows
+from blog.models import Category, Comment, Post, User
+from blog.streaming import chunked
+from blog.threads import thread
+
+# Сколько комментариев создавать одним запросом
+CREATE_BATCH = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пиковую память при отрисовке комментариев поста: '
+            'queryset с экземплярами моделей против потока лёгких строк. '
+            'Тестовые данные создаются в транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=100_000,
+                            help='Количество комментариев у поста.')
+
+    def create_post(self, count):
+        author = User.objects.create(username='bench-comment-memory')
+        post = Post.objects.create(
+            title='Замер памяти', text='Текст', author=author,
+            category=Category.objects.create(
+                title='Замер', description='Замер', slug='bench-memory'),
+            pub_date=now())
+        for start in range(0, count, CREATE_BATCH):
+            Comment.objects.bulk_create(
+                Comment(post=post, author=author, text=f'Комментарий {number}')
+                for number in range(start, min(start + CREATE_BATCH, count)))
+        return post
+
+    def measure(self, render):
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = render()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size, elapsed, peak / 2 ** 20
+
+    def render_models(self, post):
+        return len(render_to_string(
+            'includes/comment_list.html',
+            {'post': post,
+             'comments': list(post.comments.select_related('author'))}))
+
+    def render_rows(self, post):
+        return sum(
+            len(render_to_string('includes/comment_list.html',
+                                 {'post': post, 'comments': chunk}))
+            for chunk in chunked(comment_rows(thread(post.pk))))
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                post = self.create_post(options['comments'])
+                for name, render in (('Экземпляры моделей',
+                                      self.render_models),
+                                     ('Поток строк', self.render_rows)):
+                    size, elapsed, peak = self.measure(lambda: render(post))
+                    self.stdout.write(
+                        f'{name}: {elapsed:.1f} с, пик памяти {peak:.1f} МБ,'
+                        f' {size} символов')
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views import static
+
+from blog import media_serve
+
+# Размер блока при записи тестового файла
+WRITE_BLOCK = 2 ** 20
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность отдачи большого медиафайла '
+            'через django.views.static.serve и blog.media_serve: целиком, '
+            'диапазоном Range и через sendfile. Файл создаётся во '
+            'временном каталоге.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=64,
+                            help='Размер файла, МБ.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Количество запросов в каждом замере.')
+
+    def create_file(self, directory, size):
+        name = 'bench.jpg'
+        with open(os.path.join(directory, name), 'wb') as file:
+            for _ in range(size):
+                file.write(os.urandom(WRITE_BLOCK))
+        return name
+
+    def read_python(self, response):
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def read_sendfile(self, response):
+        # Так wsgi.file_wrapper gunicorn отправляет файл в сокет.
+        source = response.file_to_stream.fileno()
+        offset = os.lseek(source, 0, os.SEEK_CUR)
+        count = int(response['Content-Length'])
+        sent = 0
+        with open(os.devnull, 'wb') as target:
+            while sent < count:
+                written = os.sendfile(target.fileno(), source,
+                                      offset + sent, count - sent)
+                if not written:
+                    break
+                sent += written
+        response.close()
+        return sent
+
+    def measure(self, view, read, request, useful, name, document_root,
+                repeat):
+        """Полезных МБ/с: static.serve не поддерживает Range и отдаёт
+        файл целиком, полезна же только запрошенная часть.
+        """
+        started = time.perf_counter()
+        for _ in range(repeat):
+            if document_root is None:
+                response = view(request, name)
+            else:
+                response = view(request, name, document_root=document_root)
+            read(response)
+        return repeat * useful / 2 ** 20 / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        tail = options['size'] * WRITE_BLOCK // 10
+        requests = {
+            'Целиком': (factory.get('/'), options['size'] * WRITE_BLOCK),
+            'Последние 10%': (
+                factory.get('/', HTTP_RANGE=f'bytes=-{tail}'), tail),
+        }
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(MEDIA_ROOT=directory, MEDIA_OFFLOAD=None):
+            name = self.create_file(directory, options['size'])
+            for title, (request, useful) in requests.items():
+                for label, view, read, document_root in (
+                        ('static.serve', static.serve, self.read_python,
+                         directory),
+                        ('media_serve', media_serve.serve, self.read_python,
+                         None),
+                        ('media_serve + sendfile', media_serve.serve,
+                         self.read_sendfile, None)):
+                    speed = self.measure(view, read, request, useful, name,
+                                         document_root, options['repeat'])
+                    self.stdout.write(f'{title}, {label}: {speed:.0f} МБ/с')
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Запускается в отдельном процессе, чтобы замерить холодный старт.
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from wsgiref.util import setup_testing_defaults
+application = get_wsgi_application()
+if sys.argv[1] == '1':
+    from blogicum.warmup import warm_up
+    warm_up()
+ready = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[2], 'HTTP_HOST': sys.argv[3]}
+setup_testing_defaults(environ)
+status = []
+b''.join(application(environ, lambda code, headers: status.append(code)))
+done = time.perf_counter()
+print(json.dumps({'ready': ready - started, 'first': done - ready,
+                  'status': status[0]}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время готовности нового процесса и его первого '
+            'ответа с прогревом и без него.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Количество запусков в каждом режиме.')
+        parser.add_argument('--path', default='/',
+                            help='Адрес первого запроса.')
+
+    def probe(self, warm, path):
+        environment = dict(
+            os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'blogicum.settings'))
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, '1' if warm else '0', path,
+             (settings.ALLOWED_HOSTS or ['localhost'])[0]],
+            cwd=settings.BASE_DIR, env=environment, check=True,
+            capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for warm in (False, True):
+            results = [self.probe(warm, options['path'])
+                       for _ in range(options['runs'])]
+            mode = 'с прогревом' if warm else 'без прогрева'
+            ready = median(result['ready'] for result in results) * 1000
+            first = median(result['first'] for result in results) * 1000
+            self.stdout.write(
+                f'{mode}: готовность {ready:.0f} мс, первый ответ '
+                f'{first:.0f} мс (статус {results[0]["status"]})')
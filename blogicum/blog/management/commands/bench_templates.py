@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from blog.forms import CommentForm
+from blog.models import Category, Post, User
+from blog.posts_utils import (posts_annotate, posts_filtered_by_published,
+                              posts_pagination)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время отрисовки страниц блога шаблонами Django '
+            'и Jinja2 на данных из базы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200,
+                            help='Количество отрисовок каждой страницы.')
+
+    def page(self, request, posts):
+        page_obj = posts_pagination(
+            posts_filtered_by_published(posts_annotate(posts)), request)
+        page_obj.object_list = list(page_obj.object_list)
+        return page_obj
+
+    def contexts(self, request):
+        post = posts_filtered_by_published(Post.objects).first()
+        if post is None:
+            raise CommandError('Нет опубликованных постов для замера')
+        category = Category.objects.get(pk=post.category_id)
+        profile = User.objects.get(pk=post.author_id)
+        return {
+            'blog/index.html': {'page_obj': self.page(request, Post.objects)},
+            'blog/category.html': {
+                'category': category,
+                'page_obj': self.page(request, category.posts.all())},
+            'blog/profile.html': {
+                'profile': profile,
+                'posts_count': profile.posts.count(),
+                'page_obj': self.page(request, profile.posts.all())},
+            'blog/detail.html': {
+                'post': post,
+                'comments': list(post.comments.select_related('author')),
+                'form': CommentForm()},
+        }
+
+    def measure(self, template_name, context, request, using, repeat):
+        render_to_string(template_name, context, request, using=using)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render_to_string(template_name, context, request, using=using)
+        return (time.perf_counter() - started) / repeat * 1000
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        for template_name, context in self.contexts(request).items():
+            django_ms, jinja_ms = (
+                self.measure(template_name, context, request, using,
+                             options['repeat'])
+                for using in ('django', 'jinja2'))
+            self.stdout.write(
+                f'{template_name}: Django {django_ms:.2f} мс, '
+                f'Jinja2 {jinja_ms:.2f} мс '
+                f'({django_ms / jinja_ms:.1f}x)')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.static_site import build
+
+
+class Command(BaseCommand):
+    help = ('Собирает статическую копию публичных страниц блога '
+            'со сжатыми вариантами. По умолчанию пересобирает только '
+            'страницы, изменившиеся с прошлой сборки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Пересобрать все страницы.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Количество процессов; 0 — без пула.')
+
+    def handle(self, *args, **options):
+        built, removed = build(options['workers'], options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Собрано страниц: {len(built)}, удалено: {len(removed)}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog.const import MEDIA_GC_BATCH_SIZE, MEDIA_GC_GRACE
+from blog.media_gc import collect_garbage
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из каталога картинок публикаций файлы, на которые '
+            'не ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать лишние файлы.')
+        parser.add_argument('--quarantine', metavar='DIR',
+                            help='Переносить лишние файлы в этот каталог '
+                            'вместо удаления.')
+        parser.add_argument('--grace', type=int, default=MEDIA_GC_GRACE,
+                            help='Не трогать файлы моложе этого срока, с.')
+        parser.add_argument('--batch-size', type=int,
+                            default=MEDIA_GC_BATCH_SIZE,
+                            help='Сколько файлов перепроверять за раз.')
+
+    def handle(self, *args, **options):
+        def report(name, size):
+            if options['verbosity'] > 1 or options['dry_run']:
+                self.stdout.write(f'{name} ({filesizeformat(size)})')
+
+        stats = collect_garbage(
+            dry_run=options['dry_run'],
+            quarantine=options['quarantine'],
+            grace=options['grace'],
+            batch_size=options['batch_size'],
+            on_orphan=report)
+        action, count = 'удалено', stats['removed']
+        if options['dry_run']:
+            action, count = 'было бы удалено', stats['orphaned']
+        elif options['quarantine']:
+            action = 'перенесено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Просмотрено файлов: {stats["scanned"]}, лишних: '
+            f'{stats["orphaned"]} ({filesizeformat(stats["bytes"])}), '
+            f'{action}: {count}'))
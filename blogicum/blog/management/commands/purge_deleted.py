@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.const import DELETE_BATCH_SIZE, PURGE_DELETED_PAUSE
+from blog.deletion import purge_deleted
+
+
+class Command(BaseCommand):
+    help = ('Физически удаляет мягко удалённые публикации с их '
+            'комментариями и картинками, а также удалённые комментарии. '
+            'Предназначена для периодического запуска, например из cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=DELETE_BATCH_SIZE,
+                            help='Сколько строк удалять одним запросом.')
+        parser.add_argument('--pause', type=float,
+                            default=PURGE_DELETED_PAUSE,
+                            help='Пауза между пачками, с.')
+        parser.add_argument('--older-than', type=int, default=0,
+                            help='Удалять только записи, помеченные '
+                            'больше указанного числа секунд назад.')
+
+    def handle(self, *args, **options):
+        posts, comments = purge_deleted(options['batch_size'],
+                                        options['pause'],
+                                        options['older_than'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено публикаций: {posts}, комментариев: {comments}'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики публикаций всех лент.'
+
+    def handle(self, *args, **options):
+        rebuilt = reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано счётчиков: {rebuilt}'))
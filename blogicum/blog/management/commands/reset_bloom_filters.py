@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.bloom import reset_all
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает фильтры Блума всех процессов после загрузки '
+            'строк мимо сигналов, например через bulk_create.')
+
+    def handle(self, *args, **options):
+        reset_all()
+        self.stdout.write(self.style.SUCCESS(
+            'Фильтры будут перестроены при следующем отказе'))
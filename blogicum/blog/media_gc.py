@@ -0,0 +1,88 @@
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+from .const import MEDIA_GC_BATCH_SIZE, MEDIA_GC_GRACE
+from .models import Post, StoredImage
+from .storage import discard
+from .uploads import IMAGES_DIR
+
+
+def referenced_images():
+    """Имена файлов, на которые ссылаются публикации, включая мягко
+    удалённые: их картинки удалит purge_deleted.
+    """
+    return set(Post.all_objects.exclude(image='').values_list(
+        'image', flat=True).iterator())
+
+
+def walk(directory):
+    """Файлы дерева каталогов; os.scandir не делает лишних stat."""
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def _dispose(batch, stats, dry_run, quarantine, on_orphan, grace):
+    # Ссылки могли появиться после того, как был прочитан их список.
+    still_used = set(Post.all_objects.filter(
+        image__in=[name for name, _, _ in batch]
+    ).values_list('image', flat=True))
+    removed = []
+    for name, path, size in batch:
+        if name in still_used:
+            continue
+        stats['orphaned'] += 1
+        stats['bytes'] += size
+        if on_orphan is not None:
+            on_orphan(name, size)
+        if dry_run:
+            continue
+        # Между обходом и удалением файл могли загрузить повторно.
+        target = None if quarantine is None else Path(quarantine) / name
+        if not discard(path, grace, target):
+            continue
+        removed.append(name)
+        stats['removed'] += 1
+    StoredImage.objects.filter(name__in=removed).delete()
+
+
+def collect_garbage(dry_run=False, quarantine=None, grace=MEDIA_GC_GRACE,
+                    batch_size=MEDIA_GC_BATCH_SIZE, on_orphan=None):
+    """Удаляет из MEDIA_ROOT/posts_images файлы, на которые не ссылается
+    ни одна публикация, или переносит их в каталог quarantine.
+
+    Файлы моложе grace секунд не трогаются. Перед удалением каждая
+    пачка из batch_size файлов ещё раз сверяется с базой. Возвращает
+    счётчики: просмотрено, лишних, их объём и удалено.
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    referenced = referenced_images()
+    cutoff = time.time() - grace
+    stats = Counter(scanned=0, orphaned=0, bytes=0, removed=0)
+    batch = []
+    for entry in walk(media_root / IMAGES_DIR):
+        stats['scanned'] += 1
+        name = Path(entry.path).relative_to(media_root).as_posix()
+        if name in referenced:
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > cutoff:
+            continue
+        batch.append((name, entry.path, stat.st_size))
+        if len(batch) >= batch_size:
+            _dispose(batch, stats, dry_run, quarantine, on_orphan, grace)
+            batch = []
+    if batch:
+        _dispose(batch, stats, dry_run, quarantine, on_orphan, grace)
+    return stats
@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .const import MEDIA_IMMUTABLE_MAX_AGE, MEDIA_MAX_AGE
+from .uploads import IMAGES_DIR
+
+# Имя файла из ContentAddressedStorage: содержимое по нему не меняется
+CONTENT_ADDRESSED = re.compile(
+    rf'^{IMAGES_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<digest>[0-9a-f]{{64}})'
+    r'\.\w+$')
+
+RANGE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+
+class FileRange:
+    """Часть открытого файла для FileResponse.
+
+    read() не выходит за границы диапазона — так отдаёт файл Django
+    без wsgi.file_wrapper. fileno() и позиция файла позволяют серверу
+    с sendfile (например, gunicorn) отправить те же Content-Length байт
+    без копирования через Python.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Границы единственного диапазона из заголовка Range или None,
+    если заголовок не разобран; ValueError — диапазон вне файла.
+    Несколько диапазонов не поддерживаются: файл отдаётся целиком.
+    """
+    match = RANGE.match(header.strip())
+    if match is None or not (match['start'] or match['end']):
+        return None
+    if not match['start']:
+        length = min(int(match['end']), size)
+        if not length:
+            raise ValueError(header)
+        return size - length, size - 1
+    start = int(match['start'])
+    end = min(int(match['end']), size - 1) if match['end'] else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if end < start:
+        return None
+    return start, end
+
+
+def _if_range_matches(request, etag, modified):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # Для If-Range годится только строгое сравнение ETag.
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(modified)
+
+
+def validators(path, file_stat):
+    """Валидаторы кэша: ETag, время изменения и признак того, что
+    файл неизменяем. Для файла с именем из хэша ETag — сам хэш, иначе
+    время изменения и размер, как у nginx.
+    """
+    match = CONTENT_ADDRESSED.match(path)
+    if match:
+        etag = f'"{match["digest"]}"'
+    else:
+        etag = f'"{int(file_stat.st_mtime):x}-{file_stat.st_size:x}"'
+    return etag, file_stat.st_mtime, match is not None
+
+
+def _offload(path, fullpath, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_OFFLOAD == 'X-Accel-Redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + path
+    else:
+        response[settings.MEDIA_OFFLOAD] = fullpath
+    return response
+
+
+def _file_response(request, fullpath, content_type, size, etag,
+                   modified):
+    header = request.headers.get('Range')
+    bounds = None
+    if header is not None and _if_range_matches(request, etag, modified):
+        try:
+            bounds = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    file = open(fullpath, 'rb')
+    if bounds is None:
+        return FileResponse(file, content_type=content_type)
+    start, end = bounds
+    response = FileResponse(FileRange(file, start, end - start + 1),
+                            status=206, content_type=content_type)
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Отдаёт файл из MEDIA_ROOT вместо django.views.static.serve.
+
+    Поддерживает условные запросы (If-None-Match, If-Modified-Since)
+    и один диапазон Range. Файлы с именем из хэша содержимого
+    кэшируются браузерами и прокси на год как неизменяемые. Если задан
+    MEDIA_OFFLOAD, сам файл отправляет веб-сервер по заголовку
+    X-Accel-Redirect или X-Sendfile; иначе он передаётся через
+    wsgi.file_wrapper, который у gunicorn и uWSGI использует sendfile.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        # Скрытые файлы — это незаконченные загрузки хранилища.
+        raise Http404
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+    etag, modified, immutable = validators(path, file_stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(modified))
+    if response is None:
+        content_type = (mimetypes.guess_type(fullpath)[0]
+                        or 'application/octet-stream')
+        if settings.MEDIA_OFFLOAD:
+            response = _offload(path, fullpath, content_type)
+        else:
+            response = _file_response(request, fullpath, content_type,
+                                      file_stat.st_size, etag, modified)
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    if immutable:
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=MEDIA_IMMUTABLE_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_MAX_AGE)
+    return response
@@ -0,0 +1,38 @@
+from django.conf import settings
+
+from .const import SURROGATE_KEY_MAX_LENGTH
+from .dependencies import ALL_USERS_TAG
+
+
+def surrogate_keys(tags):
+    """Значение заголовка с тегами; слишком длинный список
+    огрубляется, чтобы прокси не отбросил заголовок.
+
+    Теги comment: убираются первыми: изменение комментария сбрасывает
+    и post:<id> его поста. Затем user: заменяются общим user:all,
+    который сбрасывает изменение любого пользователя.
+    """
+    header = ' '.join(sorted(tags))
+    if len(header) > SURROGATE_KEY_MAX_LENGTH:
+        tags = {tag for tag in tags if not tag.startswith('comment:')}
+        header = ' '.join(sorted(tags))
+    if len(header) > SURROGATE_KEY_MAX_LENGTH:
+        tags = {tag for tag in tags if not tag.startswith('user:')}
+        header = ' '.join(sorted(tags | {ALL_USERS_TAG}))
+    return header
+
+
+class SurrogateKeyMiddleware:
+    """Передаёт прокси теги объектов, от которых зависит ответ,
+    чтобы при их изменении сбрасывать только нужные страницы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        tags = getattr(response, 'dependencies', None)
+        if tags and not response.has_header(settings.BLOG_SURROGATE_HEADER):
+            response[settings.BLOG_SURROGATE_HEADER] = surrogate_keys(tags)
+        return response
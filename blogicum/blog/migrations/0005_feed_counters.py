@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:15
+
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def mark_counted_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=now(),
+    ).update(is_counted=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_auto_20240424_1748'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Общая лента'), ('category', 'Категория'), ('author', 'Автор')], max_length=16, verbose_name='Лента')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='Идентификатор категории или автора')),
+                ('published', models.IntegerField(default=0, verbose_name='Опубликовано')),
+                ('total', models.IntegerField(default=0, verbose_name='Всего')),
+                ('next_go_live', models.DateTimeField(blank=True, null=True, verbose_name='Ближайшая отложенная публикация')),
+            ],
+            options={
+                'verbose_name': 'счётчик ленты',
+                'verbose_name_plural': 'Счётчики лент',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_counted',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Учтена в счётчиках лент'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(help_text='Если установить дату и время в будущем — можно делать отложенные публикации.', verbose_name='Дата и время публикации'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'object_id'), name='unique_feed_counter'),
+        ),
+        migrations.RunPython(mark_counted_posts, migrations.RunPython.noop),
+    ]
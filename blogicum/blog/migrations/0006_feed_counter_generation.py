@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_feed_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedcounter',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='feedcounter',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Поколение ленты'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_feed_counter_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_generation',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Поколение комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+    ]
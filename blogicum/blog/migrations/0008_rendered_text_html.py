@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:38
+
+import blog.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_change_stamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=blog.fields.RenderedHTMLField(source='text', verbose_name='Текст комментария в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=blog.fields.RenderedHTMLField(source='text', verbose_name='Текст в HTML'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:56
+
+import blog.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='deleted_at',
+            field=blog.fields.TombstoneField(verbose_name='Удалён'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='deleted_at',
+            field=blog.fields.TombstoneField(verbose_name='Удалена'),
+        ),
+    ]
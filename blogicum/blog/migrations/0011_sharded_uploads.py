@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:58
+
+import blog.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to=blog.uploads.sharded_upload_to, verbose_name='Фото'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-19 20:00
+
+import blog.storage
+import blog.uploads
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    StoredImage = apps.get_model('blog', 'StoredImage')
+    StoredImage.objects.bulk_create(
+        StoredImage(name=row['image'], references=row['references'])
+        for row in Post.objects.exclude(image='').order_by().values(
+            'image').annotate(references=Count('pk')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_sharded_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('name', models.CharField(max_length=256, unique=True, verbose_name='Файл')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл картинки',
+                'verbose_name_plural': 'Файлы картинок',
+                'ordering': ('created_at',),
+                'abstract': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to=blog.uploads.sharded_upload_to, verbose_name='Фото'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
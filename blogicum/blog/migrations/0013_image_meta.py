@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-19 20:06
+
+import blog.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_stored_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=blog.fields.ImageMetaField(source='image', verbose_name='Размеры и миниатюра фото'),
+        ),
+    ]
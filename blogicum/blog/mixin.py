@@ -2,8 +2,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from .forms import PostForm, CommentForm
+from .image_upload import PostImageUploadHandler
 from .models import Post, Comment
 
 
@@ -12,6 +15,28 @@ class OnlyAuthorMixin(UserPassesTestMixin):
         return self.get_object().author == self.request.user
 
 
+class ImageUploadMixin:
+    """Проверяет картинку публикации во время загрузки.
+
+    Обработчик загрузки должен стоять в request.upload_handlers до
+    разбора тела запроса, а CsrfViewMiddleware разбирает его, читая
+    request.POST. Поэтому view освобождена от проверки CSRF
+    в middleware и проверяет токен сама, уже после установки
+    обработчика.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        self.image_upload = PostImageUploadHandler(request)
+        request.upload_handlers.insert(0, self.image_upload)
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = self.image_upload.errors
+        return kwargs
+
+
 class PostMixin(LoginRequiredMixin, OnlyAuthorMixin):
     model = Post
     pk_url_kwarg = 'post_id'
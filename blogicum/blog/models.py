@@ -1,9 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
+from django.utils.timezone import now
 
 from core.models import CreatedAt, IsPublishedCreatedAt
-from .const import CHAR_LENGTH, NAME_LENGTH_LIMIT
+from .const import (CHAR_LENGTH, COMMENT_MAX_DEPTH, COMMENT_PATH_STEP,
+                    NAME_LENGTH_LIMIT)
+from .fields import ImageMetaField, RenderedHTMLField, TombstoneField
+from .storage import image_storage
+from .uploads import image_upload_to
 
 User = get_user_model()
 
@@ -44,6 +49,13 @@ class Location(IsPublishedCreatedAt):
         return self.name[:NAME_LENGTH_LIMIT]
 
 
+class LiveManager(models.Manager):
+    """Менеджер без мягко удалённых записей."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Post(IsPublishedCreatedAt):
     title = models.CharField(
         max_length=CHAR_LENGTH,
@@ -52,6 +64,9 @@ class Post(IsPublishedCreatedAt):
     text = models.TextField(
         'Текст'
     )
+    text_html = RenderedHTMLField(
+        verbose_name='Текст в HTML'
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в '
@@ -60,9 +75,13 @@ class Post(IsPublishedCreatedAt):
     )
     image = models.ImageField(
         'Фото',
-        upload_to='posts_images',
+        upload_to=image_upload_to,
+        storage=image_storage,
         blank=True
     )
+    image_meta = ImageMetaField(
+        verbose_name='Размеры и миниатюра фото'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -84,6 +103,27 @@ class Post(IsPublishedCreatedAt):
         verbose_name='Категория',
         null=True
     )
+    is_counted = models.BooleanField(
+        default=False,
+        editable=False,
+        db_index=True,
+        verbose_name='Учтена в счётчиках лент'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    comments_generation = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Поколение комментариев'
+    )
+    deleted_at = TombstoneField(
+        verbose_name='Удалена'
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -102,6 +142,9 @@ class Comment(CreatedAt):
     text = models.TextField(
         'Текст комментария'
     )
+    text_html = RenderedHTMLField(
+        verbose_name='Текст комментария в HTML'
+    )
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -113,10 +156,136 @@ class Comment(CreatedAt):
         related_name='comments',
         verbose_name='Автор'
     )
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='replies',
+        verbose_name='Ответ на'
+    )
+    path = models.CharField(
+        max_length=CHAR_LENGTH,
+        blank=True, default='', editable=False,
+        verbose_name='Путь в ветке',
+        help_text='Номера комментариев от корня ветки; сортировка '
+        'по пути даёт порядок показа.'
+    )
+    depth = models.PositiveSmallIntegerField(
+        default=0, editable=False,
+        verbose_name='Уровень вложенности'
+    )
+    deleted_at = TombstoneField(
+        verbose_name='Удалён'
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta(CreatedAt.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(fields=('post', 'path'), name='comment_thread'),
+            models.Index(fields=('post', 'depth', 'path'),
+                         name='comment_level'),
+        )
 
     def __str__(self):
         return self.text[:NAME_LENGTH_LIMIT]
+
+    @staticmethod
+    def child_path(parent_path, pk):
+        return f'{parent_path}{pk:0{COMMENT_PATH_STEP}d}'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        if self.parent is not None and self.parent.depth >= COMMENT_MAX_DEPTH:
+            # Ответы глубже предела становятся соседями родителя.
+            self.parent = self.parent.parent
+        self.depth = 0 if self.parent is None else self.parent.depth + 1
+        # Путь содержит собственный номер, известный только после вставки.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            self.path = self.child_path(
+                '' if self.parent is None else self.parent.path, self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+
+class FeedCounter(models.Model):
+    """Счётчики публикаций общей ленты, лент категорий и авторов."""
+
+    GLOBAL = 'global'
+    CATEGORY = 'category'
+    AUTHOR = 'author'
+    SCOPES = (
+        (GLOBAL, 'Общая лента'),
+        (CATEGORY, 'Категория'),
+        (AUTHOR, 'Автор'),
+    )
+
+    scope = models.CharField(
+        max_length=16,
+        choices=SCOPES,
+        verbose_name='Лента'
+    )
+    object_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Идентификатор категории или автора'
+    )
+    published = models.IntegerField(
+        default=0,
+        verbose_name='Опубликовано'
+    )
+    total = models.IntegerField(
+        default=0,
+        verbose_name='Всего'
+    )
+    next_go_live = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Ближайшая отложенная публикация'
+    )
+    generation = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Поколение ленты'
+    )
+    changed_at = models.DateTimeField(
+        default=now,
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'счётчик ленты'
+        verbose_name_plural = 'Счётчики лент'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('scope', 'object_id'),
+                name='unique_feed_counter'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}'
+
+
+class StoredImage(CreatedAt):
+    """Файл картинки в хранилище по хэшу содержимого и число
+    публикаций, которые на него ссылаются.
+    """
+
+    name = models.CharField(
+        max_length=CHAR_LENGTH,
+        unique=True,
+        verbose_name='Файл'
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ссылок'
+    )
+
+    class Meta(CreatedAt.Meta):
+        verbose_name = 'файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        return self.name
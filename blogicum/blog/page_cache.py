@@ -0,0 +1,142 @@
+import math
+import random
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+from . import dependencies
+from .const import (PAGE_CACHE_EARLY_REFRESH_BETA, PAGE_CACHE_LOCK_TIMEOUT,
+                    PAGE_CACHE_LOCK_WAIT, PAGE_CACHE_STALE_TIMEOUT)
+from .templatetags.holes import decode_hole
+
+HOLE_RE = re.compile(r'<!--hole ([A-Za-z0-9_=-]+)-->')
+
+
+def page_key(*parts):
+    return 'page:' + ':'.join(str(part) for part in parts)
+
+
+def _acquire(lock_key):
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, PAGE_CACHE_LOCK_TIMEOUT):
+        return token
+
+
+def _release(lock_key, token):
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _refresh_early(entry, now):
+    """Вероятностное раннее обновление (XFetch): чем ближе истечение
+    и чем дольше пересчёт, тем вероятнее обновить значение заранее.
+    """
+    return (now - entry['delta'] * PAGE_CACHE_EARLY_REFRESH_BETA
+            * math.log(1 - random.random())) >= entry['expires']
+
+
+def _compute_and_store(key, version, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    cache.set(key, {'version': version,
+                    'value': value,
+                    'delta': delta,
+                    'expires': time.time() + timeout},
+              timeout + PAGE_CACHE_STALE_TIMEOUT)
+    return value
+
+
+def get_or_compute(key, version, compute, timeout):
+    """Значение из кэша с защитой от одновременного пересчёта.
+
+    Пересчитывает только процесс, захвативший блокировку в общем кэше;
+    остальные получают устаревшее значение, если оно есть, или ждут.
+    Свежие значения обновляются заранее с вероятностью, растущей
+    к моменту истечения.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    fresh = (entry is not None and entry['version'] == version
+             and now < entry['expires'])
+    if fresh and not _refresh_early(entry, now):
+        return entry['value']
+    lock_key = f'{key}:lock'
+    token = _acquire(lock_key)
+    if token is not None:
+        try:
+            return _compute_and_store(key, version, compute, timeout)
+        finally:
+            _release(lock_key, token)
+    if entry is not None:
+        return entry['value']
+    deadline = time.monotonic() + PAGE_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None and entry['version'] == version:
+            return entry['value']
+    return compute()
+
+
+def template_engine():
+    """Движок для страниц блога: Jinja2, если он включён настройкой."""
+    return 'jinja2' if settings.BLOG_JINJA2 else None
+
+
+def render_skeleton(request, template_name, context, using=None):
+    """Отрисовывает общий для всех пользователей скелет страницы:
+    данные пользователя заменяются метками {% hole %}.
+    """
+    context = dict(context, punch_holes=True, user=AnonymousUser())
+    return render_to_string(template_name, context, request=request,
+                            using=using)
+
+
+def fill_holes(skeleton, request, hole_context=None):
+    """Дорисовывает в скелете данные текущего пользователя."""
+    hole_context = hole_context or {}
+
+    def render_hole(match):
+        template_name, values = decode_hole(match.group(1))
+        return render_to_string(template_name, {**hole_context, **values},
+                                request=request)
+
+    return HOLE_RE.sub(render_hole, skeleton)
+
+
+def cached_render(request, template_name, get_context, key, version,
+                  hole_context=None):
+    """render() с кэшированием скелета страницы.
+
+    get_context вызывается только при пересчёте, hole_context —
+    небольшой контекст для дорисовки данных пользователя. version
+    меняется вместе с содержимым страницы (поколение ленты, версия
+    поста), поэтому явная инвалидация не нужна. Теги объектов,
+    записанные при пересчёте, сохраняются вместе со скелетом и в графе
+    зависимостей.
+    """
+    using = template_engine()
+    if not settings.BLOG_PAGE_CACHE:
+        return render(request, template_name,
+                      {**get_context(), **(hole_context or {})},
+                      using=using)
+
+    def compute():
+        skeleton = render_skeleton(request, template_name, get_context(),
+                                   using)
+        tags = dependencies.current() or set()
+        dependencies.register(tags, key, request.get_full_path())
+        return skeleton, sorted(tags)
+
+    skeleton, tags = get_or_compute(
+        key, version, compute, settings.BLOG_PAGE_CACHE_TIMEOUT)
+    dependencies.record(*tags)
+    return HttpResponse(fill_holes(skeleton, request, hole_context))
@@ -1,14 +1,19 @@
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Count, Q
 from django.utils.timezone import now
 
 from .const import QUANTITY_PER_PAGE
 
 
+def published_posts_q():
+    return Q(is_published=True,
+             category__is_published=True,
+             pub_date__lte=now(),
+             deleted_at__isnull=True)
+
+
 def posts_filtered_by_published(manager_of_posts):
-    return manager_of_posts.filter(is_published=True,
-                                   category__is_published=True,
-                                   pub_date__lte=now())
+    return manager_of_posts.filter(published_posts_q())
 
 
 def posts_annotate(posts):
@@ -17,13 +22,39 @@ def posts_annotate(posts):
         'location',
         'author'
     ).annotate(
-        comment_count=Count('comments')
+        comment_count=Count(
+            'comments', filter=Q(comments__deleted_at__isnull=True))
     ).order_by('-pub_date')
 
 
-def posts_pagination(posts, request):
+class CountedPaginator(Paginator):
+    """Пагинатор, которому можно передать заранее известное
+    количество записей вместо запроса COUNT.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
 
-    paginator = Paginator(posts, QUANTITY_PER_PAGE)
+def posts_pagination(posts, request, count=None):
+
+    paginator = CountedPaginator(posts, QUANTITY_PER_PAGE, count=count)
     page_number = request.GET.get('page')
 
     return paginator.get_page(page_number)
+
+
+def page_number(request, count):
+    """Номер страницы из ?page=, как его поймёт get_page: не число —
+    первая страница, за пределами — последняя. Годится для ETag и ключей
+    кэша, в отличие от сырого значения из запроса.
+    """
+    paginator = CountedPaginator((), QUANTITY_PER_PAGE, count=count)
+    try:
+        return paginator.validate_number(request.GET.get('page', 1))
+    except PageNotAnInteger:
+        return 1
+    except EmptyPage:
+        return paginator.num_pages
@@ -0,0 +1,85 @@
+import json
+import logging
+import queue as queue_module
+import threading
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+
+from .const import PURGE_BATCH_SIZE, PURGE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+# Запросы к прокси уходят из фонового потока: on_commit выполняется
+# в потоке запроса, и медленный прокси задерживал бы ответ
+_outbox = queue_module.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def send(tags):
+    """Отправляет прокси запрос на сброс ответов с тегами tags."""
+    tags = sorted(tags)
+    for start in range(0, len(tags), PURGE_BATCH_SIZE):
+        request = Request(
+            settings.BLOG_PURGE_URL,
+            data=json.dumps({'tags': tags[start:start + PURGE_BATCH_SIZE]}
+                            ).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        try:
+            with urlopen(request, timeout=PURGE_TIMEOUT):
+                pass
+        except (URLError, OSError):
+            logger.exception('Не удалось сбросить кэш прокси')
+
+
+def _work():
+    while True:
+        tags = _outbox.get()
+        try:
+            send(tags)
+        finally:
+            _outbox.task_done()
+
+
+def _start_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name='blog-purge',
+                                       daemon=True)
+            _worker.start()
+
+
+def flush():
+    tags = getattr(_pending, 'tags', None)
+    _pending.tags = set()
+    if tags:
+        _start_worker()
+        _outbox.put(tags)
+
+
+def wait():
+    """Ждёт, пока фоновый поток отправит все переданные ему сбросы."""
+    _outbox.join()
+
+
+def queue(tags):
+    """Копит теги до конца транзакции и отправляет их одним запросом.
+
+    Первый из обработчиков on_commit передаёт всё накопленное
+    фоновому потоку, остальные ничего не делают. Теги отменённой
+    транзакции уйдут со следующей: лишний сброс безопаснее пропущенного.
+    """
+    if not settings.BLOG_PURGE_URL:
+        return
+    if getattr(_pending, 'tags', None) is None:
+        _pending.tags = set()
+    _pending.tags.update(tags)
+    transaction.on_commit(flush)
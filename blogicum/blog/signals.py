@@ -0,0 +1,239 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db.models.signals import post_init, post_migrate, pre_save
+from django.db.models import F, Q
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from . import (bloom, counters, dependencies, image_refs, lookup_cache,
+               purge)
+from .models import Category, Comment, FeedCounter, Location, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._saved_state = None
+        return
+    state = Post.all_objects.filter(pk=instance.pk).values(
+        'author_id', 'category_id', 'is_counted', 'comments_generation',
+        'image'
+    ).first()
+    instance._saved_state = state
+    if state is not None:
+        # Эти поля ведутся сигналами; устаревший экземпляр
+        # не должен их затирать.
+        instance.is_counted = state['is_counted']
+        instance.comments_generation = state['comments_generation']
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.post_changed(instance, getattr(instance, '_saved_state', None))
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    state = getattr(instance, '_saved_state', None)
+    old_image = state['image'] if state else ''
+    if old_image != instance.image.name:
+        image_refs.retain(instance.image.name)
+        image_refs.release([old_image])
+
+
+@receiver(pre_delete, sender=Post)
+def refresh_post_state(sender, instance, **kwargs):
+    state = Post.all_objects.filter(pk=instance.pk).values(
+        'author_id', 'category_id', 'is_counted'
+    ).first()
+    if state is not None:
+        instance.author_id = state['author_id']
+        instance.category_id = state['category_id']
+        instance.is_counted = state['is_counted']
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_post_delete(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    image_refs.release([instance.image.name])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, raw=False, **kwargs):
+    instance._was_published = None
+    if not raw and instance.pk is not None:
+        instance._was_published = Category.objects.filter(
+            pk=instance.pk).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def update_counters_on_category_save(sender, instance, raw=False, **kwargs):
+    was_published = getattr(instance, '_was_published', None)
+    if raw or was_published is None:
+        return
+    instance.posts.update(updated_at=now())
+    if was_published != instance.is_published:
+        counters.reconcile(instance.posts.all())
+    else:
+        counters.touch_all()
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_posts(sender, instance, **kwargs):
+    instance._post_ids = list(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def update_counters_on_category_delete(sender, instance, **kwargs):
+    FeedCounter.objects.filter(
+        scope=FeedCounter.CATEGORY, object_id=instance.pk).delete()
+    counters.reconcile(
+        Post.objects.filter(pk__in=getattr(instance, '_post_ids', ())))
+
+
+# Поля пользователя, которые выводятся на страницах блога
+USER_DISPLAY_FIELDS = ('username', 'first_name', 'last_name', 'is_staff',
+                       'date_joined')
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, **kwargs):
+    instance._saved_username = None
+    instance._saved_profile = None
+    if not raw and instance.pk is not None:
+        saved = User.objects.filter(pk=instance.pk).values(
+            *USER_DISPLAY_FIELDS).first()
+        if saved is not None:
+            instance._saved_username = saved['username']
+            instance._saved_profile = saved
+
+
+@receiver(post_save, sender=User)
+def touch_feeds_on_rename(sender, instance, raw=False, **kwargs):
+    saved_username = getattr(instance, '_saved_username', None)
+    if raw or saved_username in (None, instance.username):
+        return
+    Post.objects.filter(
+        Q(author=instance) | Q(comments__author=instance)
+    ).update(updated_at=now())
+    counters.touch_all()
+
+
+@receiver(post_save, sender=User)
+def touch_profile_on_change(sender, instance, raw=False, **kwargs):
+    """Имя, фамилия и роль видны только на странице автора: достаточно
+    сдвинуть поколение его ленты, чтобы сменились ETag и версия
+    скелета страницы.
+    """
+    saved = getattr(instance, '_saved_profile', None)
+    if raw or saved is None or saved['username'] != instance.username:
+        return
+    if any(saved[field] != getattr(instance, field)
+           for field in USER_DISPLAY_FIELDS):
+        counters.touch({(FeedCounter.AUTHOR, instance.pk)})
+
+
+@receiver(post_delete, sender=User)
+def delete_author_counter(sender, instance, **kwargs):
+    FeedCounter.objects.filter(
+        scope=FeedCounter.AUTHOR, object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Location)
+def touch_pages_on_location_save(sender, instance, created, raw=False,
+                                 **kwargs):
+    if raw or created:
+        return
+    instance.posts.update(updated_at=now())
+    counters.touch_all()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_pages_on_comment_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    post = Post.objects.filter(pk=instance.post_id).values_list(
+        'author_id', 'category_id').first()
+    if post is None:
+        return
+    Post.objects.filter(pk=instance.post_id).update(
+        comments_generation=F('comments_generation') + 1)
+    counters.touch(counters.post_scopes(*post))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_categories(sender, **kwargs):
+    lookup_cache.categories.invalidate()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_cached_locations(sender, **kwargs):
+    lookup_cache.locations.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_users(sender, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    lookup_cache.users.invalidate()
+
+
+@receiver(post_save, sender=Category)
+def remember_category_slug(sender, instance, raw=False, **kwargs):
+    bloom.category_slugs.add(instance.slug)
+
+
+@receiver(post_save, sender=User)
+def remember_username_in_filter(sender, instance, created, raw=False,
+                                **kwargs):
+    saved_username = getattr(instance, '_saved_username', None)
+    if created or saved_username not in (None, instance.username):
+        bloom.usernames.add(instance.username)
+
+
+@receiver(post_migrate)
+def reset_filters_after_migrate(sender, app_config=None, **kwargs):
+    # Миграции с данными и flush меняют таблицы мимо сигналов.
+    if sender.label == 'blog':
+        bloom.reset_all()
+
+
+@receiver(post_save, sender=Post)
+def remember_post_id(sender, instance, created, raw=False, **kwargs):
+    if created:
+        bloom.post_ids.add(instance.pk)
+
+
+TRACKED_MODELS = (Post, Category, Location, User, Comment)
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Location)
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=Comment)
+def record_loaded_instance(sender, instance, **kwargs):
+    dependencies.record_instance(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_dependent_pages(sender, instance, raw=False,
+                               update_fields=None, **kwargs):
+    if raw or sender not in TRACKED_MODELS:
+        return
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    dependencies.invalidate(instance)
+
+
+@receiver(dependencies.pages_invalidated)
+def purge_proxy_cache(sender, tags, **kwargs):
+    purge.queue(tags)
@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.http import QueryDict
+from django.urls import reverse
+
+from pages.static_pages import render_page, write_atomic
+
+from .const import QUANTITY_PER_PAGE
+from .counters import feed_count
+from .models import Category, FeedCounter, Post, User
+from .posts_utils import published_posts_q
+
+# Файл с состоянием публикаций на момент последней сборки
+STATE_FILE = '.build-state.json'
+
+# Ссылки пагинатора: на статическом хостинге ?page=N отдаёт первую
+# страницу, поэтому они переписываются на каталоги page-N/
+PAGE_LINK = re.compile(rb'href="\?page=(\d+)"')
+
+
+def site_root():
+    return Path(settings.STATIC_SITE_ROOT)
+
+
+def target_file(url):
+    """Файл страницы: /category/x/?page=2 → category/x/page-2/index.html."""
+    path, _, query = url.partition('?')
+    directory = site_root() / path.strip('/')
+    if query:
+        directory /= f'page-{QueryDict(query)["page"]}'
+    return directory / 'index.html'
+
+
+def listing_urls(url, count):
+    pages = max(1, math.ceil(count / QUANTITY_PER_PAGE))
+    directory = target_file(url).parent
+    for stale in directory.glob('page-*'):
+        number = stale.name.partition('-')[2]
+        if number.isdigit() and int(number) > pages:
+            shutil.rmtree(stale)
+    return [url] + [f'{url}?page={number}'
+                    for number in range(2, pages + 1)]
+
+
+def category_urls(category):
+    return listing_urls(
+        reverse('blog:category_posts', args=(category.slug,)),
+        feed_count(FeedCounter.CATEGORY, category.pk))
+
+
+def profile_urls(user):
+    return listing_urls(
+        reverse('blog:profile', args=(user.username,)),
+        feed_count(FeedCounter.AUTHOR, user.pk))
+
+
+def index_urls():
+    return listing_urls(reverse('blog:index'),
+                        feed_count(FeedCounter.GLOBAL))
+
+
+def post_url(post_id):
+    return reverse('blog:post_detail', args=(int(post_id),))
+
+
+def public_posts():
+    """Снимок опубликованных постов: всё, от чего зависят их страницы."""
+    return {
+        str(pk): [updated_at.timestamp(), comments_generation,
+                  username, category_slug]
+        for pk, updated_at, comments_generation, username, category_slug
+        in Post.objects.filter(published_posts_q()).order_by().values_list(
+            'pk', 'updated_at', 'comments_generation', 'author__username',
+            'category__slug')
+    }
+
+
+def load_state():
+    try:
+        return json.loads((site_root() / STATE_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def full_plan(posts):
+    urls = index_urls()
+    for category in Category.objects.filter(is_published=True):
+        urls += category_urls(category)
+    for user in User.objects.only('pk', 'username'):
+        urls += profile_urls(user)
+    urls += [post_url(pk) for pk in posts]
+    return urls, []
+
+
+def incremental_plan(old, posts):
+    """Страницы, затронутые постами, изменившимися с прошлой сборки,
+    и каталоги страниц, которых больше нет.
+    """
+    changed = {pk for pk in old.keys() | posts.keys()
+               if old.get(pk) != posts.get(pk)}
+    if not changed:
+        return [], []
+    rows = [row for pk in changed for row in (old.get(pk), posts.get(pk))
+            if row is not None]
+    urls, removed = index_urls(), []
+    for slug in {row[3] for row in rows if row[3] is not None}:
+        category = Category.objects.filter(
+            slug=slug, is_published=True).first()
+        if category is None:
+            removed.append(reverse('blog:category_posts', args=(slug,)))
+        else:
+            urls += category_urls(category)
+    for username in {row[2] for row in rows}:
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            removed.append(reverse('blog:profile', args=(username,)))
+        else:
+            urls += profile_urls(user)
+    for pk in changed:
+        if pk in posts:
+            urls.append(post_url(pk))
+        else:
+            removed.append(post_url(pk))
+    return urls, removed
+
+
+def static_page_links(content, url):
+    """Ссылки пагинатора страницы url на файлы сборки."""
+    path = url.partition('?')[0]
+
+    def replace(match):
+        number = int(match[1])
+        target = path if number == 1 else f'{path}page-{number}/'
+        return f'href="{target}"'.encode()
+
+    return PAGE_LINK.sub(replace, content)
+
+
+def render_to_file(url):
+    content = render_page(url, streaming=True)
+    # Потоком отдаются только страницы постов, а пагинатор есть лишь
+    # в готовых байтах лент.
+    if isinstance(content, bytes):
+        content = static_page_links(content, url)
+    write_atomic(target_file(url), content)
+    return url
+
+
+def _init_worker():
+    django.setup()
+    connections.close_all()
+
+
+def build(workers=None, full=False):
+    """Собирает статическую копию публичной части блога.
+
+    Без full перерисовываются только страницы, затронутые постами
+    и комментариями, изменившимися с прошлой сборки. workers=0
+    отрисовывает страницы в текущем процессе.
+    """
+    posts = public_posts()
+    state = None if full else load_state()
+    if state is None:
+        urls, removed = full_plan(posts)
+    else:
+        urls, removed = incremental_plan(state['posts'], posts)
+    for url in removed:
+        shutil.rmtree(target_file(url).parent, ignore_errors=True)
+    urls = list(dict.fromkeys(urls))
+    if workers == 0 or len(urls) < 2:
+        built = [render_to_file(url) for url in urls]
+    else:
+        connections.close_all()
+        with ProcessPoolExecutor(workers or os.cpu_count(),
+                                 initializer=_init_worker) as executor:
+            built = list(executor.map(render_to_file, urls, chunksize=16))
+    write_atomic(site_root() / STATE_FILE,
+                 json.dumps({'posts': posts}).encode(), compress=False)
+    return built, removed
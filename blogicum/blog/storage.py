@@ -0,0 +1,87 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файл под именем из SHA-256 его содержимого:
+    корень/ab/cd/<хэш>.<расширение>, где корень — первый каталог
+    предложенного имени (upload_to).
+
+    Хэш считается при потоковой записи во временный файл рядом
+    с итоговым, без чтения загрузки в память целиком. Одинаковые
+    загрузки занимают место один раз: повторная лишь обновляет время
+    изменения файла, чтобы его не убрала сборка мусора.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяет содержимое, суффиксы от совпадений не нужны.
+        return name
+
+    def _save(self, name, content):
+        root = name.replace('\\', '/').split('/')[0]
+        extension = os.path.splitext(name)[1].lower()
+        directory = self.path(root)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-',
+                                         delete=False) as temporary:
+            try:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            except BaseException:
+                os.remove(temporary.name)
+                raise
+        hexdigest = digest.hexdigest()
+        name = (f'{root}/{hexdigest[:2]}/{hexdigest[2:4]}/'
+                f'{hexdigest}{extension}')
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Файл как раз убирает discard: записываем заново.
+                pass
+            else:
+                os.remove(temporary.name)
+                return name
+        os.chmod(temporary.name, self.file_permissions_mode or 0o644)
+        os.replace(temporary.name, path)
+        return name
+
+
+def discard(path, grace, target=None):
+    """Удаляет файл path или переносит его в target, если его
+    не загружали повторно последние grace секунд; возвращает,
+    убран ли файл.
+
+    Файл сначала атомарно переименовывается. Повторная загрузка того
+    же содержимого либо успела обновить время изменения, и файл
+    возвращается на место, либо уже не найдёт его и запишет заново.
+    """
+    directory, filename = os.path.split(path)
+    hidden = os.path.join(directory, f'.discard-{filename}')
+    try:
+        os.replace(path, hidden)
+    except FileNotFoundError:
+        return False
+    if os.stat(hidden).st_mtime > time.time() - grace:
+        os.replace(hidden, path)
+        return False
+    if target is None:
+        os.remove(hidden)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(hidden, target)
+    return True
+
+
+image_storage = ContentAddressedStorage()
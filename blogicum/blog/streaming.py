@@ -0,0 +1,52 @@
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+
+from .const import STREAM_CHUNK_SIZE
+
+# Метка в странице, на месте которой передаются комментарии
+COMMENTS_MARKER = '<!--comments-->'
+
+
+def wants_streaming(request):
+    """Потоковая отрисовка включена настройкой или запрошена явно
+    (например, при сборке статической копии сайта).
+    """
+    return settings.BLOG_STREAMING_DETAIL or getattr(
+        request, 'streaming', False)
+
+
+def chunked(iterable, size=STREAM_CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_with_comments(request, template_name, context, comments,
+                         using=None):
+    """Отдаёт страницу по частям: шапку и текст поста сразу,
+    комментарии — пачками из итератора comments, не держа их все
+    в памяти, и ссылку на следующую страницу ветвей.
+    """
+    page = render_to_string(template_name,
+                            {**context, 'stream_comments': True},
+                            request=request, using=using)
+    head, _, tail = page.partition(COMMENTS_MARKER)
+
+    def stream():
+        yield head
+        for chunk in chunked(comments):
+            yield render_to_string('includes/comment_list.html',
+                                   {**context, 'comments': chunk},
+                                   request=request, using=using)
+        # Ссылка на следующие ветви: без неё страница (и её статическая
+        # копия) обрывалась бы на первой странице комментариев.
+        yield render_to_string('includes/comments_more.html', context,
+                               request=request, using=using) + tail
+
+    return StreamingHttpResponse(stream())
@@ -0,0 +1,61 @@
+import base64
+import json
+
+from django import template
+from django.template.base import token_kwargs
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+HOLE_MARKER = '<!--hole {}-->'
+
+
+def encode_hole(template_name, values):
+    payload = json.dumps([template_name, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_hole(encoded):
+    template_name, values = json.loads(base64.urlsafe_b64decode(encoded))
+    return template_name, values
+
+
+class HoleNode(template.Node):
+    def __init__(self, template_name, extra_context):
+        self.template_name = template_name
+        self.extra_context = extra_context
+
+    def render(self, context):
+        template_name = self.template_name.resolve(context)
+        values = {
+            name: value.resolve(context)
+            for name, value in self.extra_context.items()
+        }
+        if context.get('punch_holes'):
+            return mark_safe(
+                HOLE_MARKER.format(encode_hole(template_name, values)))
+        included = context.template.engine.get_template(template_name)
+        with context.push(**values):
+            return included.render(context)
+
+
+@register.tag
+def hole(parser, token):
+    """Подключает шаблон с данными конкретного пользователя.
+
+    {% hole "includes/comment_controls.html" comment_id=comment.id %}
+
+    При обычной отрисовке работает как include. При отрисовке
+    кэшируемого скелета страницы оставляет метку, которая заполняется
+    отдельно для каждого запроса; поэтому передаваемые значения
+    должны быть простыми (числа, строки).
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} требует имя шаблона')
+    extra_context = token_kwargs(bits[2:], parser)
+    if len(extra_context) != len(bits) - 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает только именованные аргументы')
+    return HoleNode(parser.compile_filter(bits[1]), extra_context)
@@ -0,0 +1,120 @@
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+from django.utils.timezone import now
+
+from . import deletion
+from .const import (COMMENT_REPLIES_PER_PARENT, COMMENT_THREADS_PER_PAGE,
+                    DELETE_BATCH_SIZE)
+from .models import Comment
+
+# Больше любой цифры пути: верхняя граница диапазона путей ветки
+PATH_END = '~'
+
+# Ссылка на ответы parent после ответа с путём after (пустой — с начала);
+# depth — отступ ссылки
+ReplyLink = namedtuple('ReplyLink', 'parent after depth')
+
+
+def _branch(post_id, path):
+    return Comment.objects.filter(
+        post_id=post_id, path__gte=path, path__lt=path + PATH_END)
+
+
+def thread(post_id):
+    """Все комментарии поста в порядке показа: один диапазонный
+    запрос по индексу (post, path).
+    """
+    return Comment.objects.filter(post_id=post_id).order_by('path')
+
+
+def _first_replies(parent_ids, limit):
+    """По limit + 1 первых ответов на каждый из parent_ids одним
+    запросом: подзапрос с LIMIT на каждого родителя идёт по индексу
+    и не читает остальные ответы.
+    """
+    if not parent_ids:
+        return []
+    condition = Q()
+    for parent_id in parent_ids:
+        condition |= Q(pk__in=Comment.objects.filter(
+            parent_id=parent_id).order_by('path').values('pk')[:limit + 1])
+    return list(Comment.objects.filter(condition).order_by('path').values_list(
+        'pk', 'parent_id', 'path', 'depth'))
+
+
+def page(post_id, parent=None, after='', limit=COMMENT_THREADS_PER_PAGE,
+         replies=COMMENT_REPLIES_PER_PARENT):
+    """Следующие limit ветвей одного уровня после ветви с путём after.
+
+    Уровень — корни поста или ответы на parent. К каждой ветви
+    добавляются не больше replies первых ответов на неё; остальные
+    ответы и ответы на ответы открываются ссылками. Возвращает
+    комментарии в порядке показа, курсор следующей страницы (None,
+    если она последняя) и ссылки: id комментария — ReplyLink, которые
+    показываются после него.
+    """
+    prefix = '' if parent is None else parent.path
+    depth = 0 if parent is None else parent.depth + 1
+    level = list(Comment.objects.filter(
+        post_id=post_id, depth=depth,
+        path__gt=max(after, prefix), path__lt=prefix + PATH_END,
+    ).order_by('path').values_list('pk', 'path')[:limit + 1])
+    if not level:
+        return Comment.objects.none(), None, {}
+    next_after = level[limit - 1][1] if len(level) > limit else None
+    level = level[:limit]
+    links = defaultdict(list)
+    shown = [pk for pk, _ in level]
+    children = defaultdict(list)
+    for pk, parent_id, path, child_depth in _first_replies(shown, replies):
+        children[parent_id].append((pk, path, child_depth))
+    previews = []
+    for parent_id, rows in children.items():
+        if len(rows) > replies:
+            last_pk, last_path, child_depth = rows[replies - 1]
+            links[last_pk].append(
+                ReplyLink(parent_id, last_path, child_depth))
+        previews += [pk for pk, _, _ in rows[:replies]]
+    depths = {pk: child_depth for rows in children.values()
+              for pk, _, child_depth in rows}
+    for pk in Comment.objects.filter(parent_id__in=previews).values_list(
+            'parent_id', flat=True).distinct():
+        links[pk].insert(0, ReplyLink(pk, '', depths[pk] + 1))
+    comments = Comment.objects.filter(
+        pk__in=shown + previews).order_by('path')
+    return comments, next_after, dict(links)
+
+
+def _branch_pks(comment):
+    """Ключи комментария и всех ответов на него: обход уровней
+    по parent_id, как в deletion.delete_comment_branches.
+    """
+    branch = [comment.pk]
+    level = branch
+    while level:
+        batches = [level[start:start + DELETE_BATCH_SIZE]
+                   for start in range(0, len(level), DELETE_BATCH_SIZE)]
+        level = [pk for batch in batches
+                 for pk in Comment.all_objects.filter(
+                     parent_id__in=batch).values_list('pk', flat=True)]
+        branch = branch + level
+    return branch
+
+
+def delete_subtree(comment):
+    """Помечает удалёнными комментарий и все ответы на него одним
+    UPDATE по диапазону путей; строки удалит purge_deleted.
+    """
+    deleted_at = now()
+    if comment.path:
+        _branch(comment.post_id, comment.path).update(deleted_at=deleted_at)
+    else:
+        # Без пути (строки из bulk_create) диапазон охватил бы весь
+        # пост, поэтому ветка собирается по parent_id.
+        branch = _branch_pks(comment)
+        for start in range(0, len(branch), DELETE_BATCH_SIZE):
+            Comment.objects.filter(
+                pk__in=branch[start:start + DELETE_BATCH_SIZE]
+            ).update(deleted_at=deleted_at)
+    deletion.comments_changed([comment.post_id])
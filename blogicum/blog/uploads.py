@@ -0,0 +1,14 @@
+# Каталог картинок публикаций внутри MEDIA_ROOT
+IMAGES_DIR = 'posts_images'
+
+
+def image_upload_to(instance, filename):
+    """posts_images/имя: ContentAddressedStorage берёт из него только
+    корень и расширение и сама раскладывает файлы по каталогам ab/cd/
+    из хэша содержимого.
+    """
+    return f'{IMAGES_DIR}/{filename}'
+
+
+# Старое имя, на которое ссылаются миграции
+sharded_upload_to = image_upload_to
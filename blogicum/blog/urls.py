@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -32,10 +32,34 @@ urlpatterns = [
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
+    path('comments/<int:comment_id>/reply/',
+         views.CommentReplyView.as_view(),
+         name='reply_comment'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>',
          views.CommentUpdateView.as_view(),
          name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>',
          views.CommentDeleteView.as_view(),
          name='delete_comment'),
+    path('feeds/rss/',
+         feeds.posts_rss,
+         name='posts_rss'),
+    path('feeds/atom/',
+         feeds.posts_atom,
+         name='posts_atom'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.category_rss,
+         name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.category_atom,
+         name='category_atom'),
+    path('profile/<slug:username>/rss/',
+         feeds.author_rss,
+         name='profile_rss'),
+    path('profile/<slug:username>/atom/',
+         feeds.author_atom,
+         name='profile_atom'),
 ]
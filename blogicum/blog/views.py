@@ -1,29 +1,54 @@
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.views.generic import UpdateView, CreateView, DeleteView
 
+from . import deletion, threads
+from .bloom import category_slugs, post_ids, require_member, usernames
+from .comment_rows import comment_rows, with_reply_links
+from .conditional import (author_id_by_username, category_id_by_slug,
+                          listing_condition, post_condition, request_counter)
+from .counters import is_visible
+from .dependencies import track
 from .forms import CommentForm, ProfileForm, PostForm
-from .models import Category, Post, User
-from .posts_utils import (posts_filtered_by_published, posts_annotate,
-                          posts_pagination)
-from .mixin import OnlyAuthorMixin, PostMixin, CommentMixin
-
-
+from .lookup_cache import attach_related, category_by_slug, user_by_username
+from .models import Comment, FeedCounter, Post, User
+from .page_cache import cached_render, page_key, template_engine
+from .posts_utils import (page_number, posts_filtered_by_published,
+                          posts_annotate, posts_pagination)
+from .streaming import stream_with_comments, wants_streaming
+from .mixin import (CommentMixin, ImageUploadMixin, OnlyAuthorMixin,
+                    PostMixin)
+
+
+@require_member(usernames, 'username')
+@listing_condition(FeedCounter.AUTHOR, author_id_by_username)
+@track
 def profile_username(request, username):
-    profile = get_object_or_404(
-        User,
-        username=username,
-    )
+    profile = user_by_username(username)
+    if profile is None:
+        raise Http404
     posts = posts_annotate(profile.posts.all())
-    if profile != request.user:
+    only_published = profile != request.user
+    if only_published:
         posts = posts_filtered_by_published(
             posts
         )
-    return render(request, 'blog/profile.html',
-                  {'profile': profile,
-                   'page_obj': posts_pagination(posts, request)})
+    counter = request_counter(request, FeedCounter.AUTHOR, profile.pk)
+    posts_count = counter.published if only_published else counter.total
+    return cached_render(
+        request,
+        'blog/profile.html',
+        lambda: {'profile': profile,
+                 'posts_count': posts_count,
+                 'page_obj': posts_pagination(posts, request,
+                                              count=posts_count)},
+        key=page_key('profile', profile.pk, only_published,
+                     page_number(request, posts_count)),
+        version=counter.generation
+    )
 
 
 def edit_profile_username(request, username):
@@ -42,61 +67,105 @@ def edit_profile_username(request, username):
     return render(request, 'blog/user.html', {'form': form})
 
 
+@listing_condition(FeedCounter.GLOBAL)
+@track
 def index(request):
-    return render(
+    counter = request_counter(request, FeedCounter.GLOBAL)
+    return cached_render(
         request,
         'blog/index.html',
-        {'page_obj': posts_pagination(
+        lambda: {'page_obj': posts_pagination(
             posts_filtered_by_published(
                 posts_annotate(Post.objects)
             ),
-            request
-        )}
+            request,
+            count=counter.published
+        )},
+        key=page_key('index', page_number(request, counter.published)),
+        version=counter.generation
     )
 
 
+def visible_post(request, post_id):
+    post = attach_related(get_object_or_404(Post, pk=post_id))
+    if post.author != request.user and not is_visible(post):
+        raise Http404
+    return post
+
+
+def comments_context(post, parent=None, after=''):
+    comments, next_after, links = threads.page(post.pk, parent, after)
+    return {'post': post, 'parent': parent,
+            'comments': with_reply_links(comment_rows(comments), links),
+            'next_comments': next_after}
+
+
+@require_member(post_ids, 'post_id')
+@post_condition
+@track
 def post_detail(request, post_id):
-    post = get_object_or_404(
-        Post.objects.select_related(
-            'category',
-            'location',
-            'author'
-        ).all(),
-        pk=post_id
+    post = visible_post(request, post_id)
+    if wants_streaming(request):
+        context = comments_context(post)
+        comments = context.pop('comments')
+        return stream_with_comments(
+            request, 'blog/detail.html',
+            {**context, 'form': CommentForm()},
+            comments,
+            using=template_engine())
+    return cached_render(
+        request,
+        'blog/detail.html',
+        lambda: comments_context(post),
+        key=page_key('post', post.pk),
+        version=(post.updated_at.timestamp(), post.comments_generation),
+        hole_context={'form': CommentForm()}
     )
-    if post.author != request.user:
-        post = get_object_or_404(
-            posts_filtered_by_published(Post.objects),
-            pk=post_id
-        )
-    context = {'post': post,
-               'form': CommentForm(),
-               'comments': post.comments.select_related('author')}
-
-    return render(request, 'blog/detail.html', context)
 
 
+@require_member(post_ids, 'post_id')
+@track
+def post_comments(request, post_id):
+    """Следующая страница ветвей: корней поста или ответов на parent."""
+    post = visible_post(request, post_id)
+    parent_id = request.GET.get('parent', '')
+    parent = None
+    if parent_id.isdigit():
+        parent = get_object_or_404(Comment, pk=parent_id, post=post)
+    after = request.GET.get('after', '')
+    return render(request, 'blog/comments.html',
+                  comments_context(post, parent,
+                                   after if after.isdigit() else ''),
+                  using=template_engine())
+
+
+@require_member(category_slugs, 'category_slug')
+@listing_condition(FeedCounter.CATEGORY, category_id_by_slug)
+@track
 def category_posts(request, category_slug):
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True,
-    )
-    page_obj = posts_pagination(
-        posts_filtered_by_published(
-            posts_annotate(
-                category.posts.all()
-            )
-        ),
-        request
+    category = category_by_slug(category_slug)
+    if category is None or not category.is_published:
+        raise Http404
+    counter = request_counter(request, FeedCounter.CATEGORY, category.pk)
+    return cached_render(
+        request,
+        'blog/category.html',
+        lambda: {'page_obj': posts_pagination(
+            posts_filtered_by_published(
+                posts_annotate(
+                    category.posts.all()
+                )
+            ),
+            request,
+            count=counter.published
+        ), 'category': category},
+        key=page_key('category', category.pk,
+                     page_number(request, counter.published)),
+        version=counter.generation
     )
 
-    return render(request,
-                  'blog/category.html',
-                  {'page_obj': page_obj, 'category': category})
-
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -106,7 +175,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(PostMixin, UpdateView):
+class PostUpdateView(ImageUploadMixin, PostMixin, UpdateView):
 
     def get_success_url(self):
         return reverse('blog:post_detail',
@@ -114,7 +183,12 @@ class PostUpdateView(PostMixin, UpdateView):
 
 
 class PostDeleteView(PostMixin, DeleteView):
-    pass
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        deletion.soft_delete_post(self.object)
+        return HttpResponseRedirect(success_url)
 
 
 class CommentCreateView(CommentMixin, CreateView):
@@ -125,12 +199,37 @@ class CommentCreateView(CommentMixin, CreateView):
         return super().form_valid(form)
 
 
+class CommentReplyView(CommentMixin, CreateView):
+
+    def get_parent(self):
+        return get_object_or_404(Comment, pk=self.kwargs['comment_id'])
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(parent=self.get_parent(), **kwargs)
+
+    def form_valid(self, form):
+        parent = self.get_parent()
+        form.instance.author = self.request.user
+        form.instance.post_id = parent.post_id
+        form.instance.parent = parent
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse('blog:post_detail',
+                       kwargs={'post_id': self.object.post_id})
+
+
 class CommentUpdateView(CommentMixin, OnlyAuthorMixin, UpdateView):
     pass
 
 
 class CommentDeleteView(CommentMixin, OnlyAuthorMixin, DeleteView):
-    pass
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        threads.delete_subtree(self.object)
+        return HttpResponseRedirect(success_url)
 
 
 class RegistrationCreateView(CreateView):
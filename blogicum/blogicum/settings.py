@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,12 +29,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'pages.middleware.StaticPagesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.SurrogateKeyMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
@@ -57,6 +60,21 @@ TEMPLATES = [
     },
 ]
 
+# Шаблоны Jinja2 для самых нагруженных страниц блога; jinja2 указан
+# в requirements.txt, но без него блог работает на шаблонах Django,
+# поэтому движок подключается, только если пакет установлен
+if find_spec('jinja2') is not None:
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'blog.jinja.environment',
+            'context_processors': TEMPLATES[0]['OPTIONS'][
+                'context_processors'],
+        },
+    })
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -118,3 +136,47 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+# Отправка медиафайлов веб-сервером: None — файл отдаёт Django,
+# 'X-Accel-Redirect' — nginx из internal-локации MEDIA_ACCEL_PREFIX,
+# 'X-Sendfile' — Apache/lighttpd по абсолютному пути
+MEDIA_OFFLOAD = None
+
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Кэширование страниц блога: скелет страницы общий для всех,
+# данные пользователя дорисовываются на каждый запрос
+BLOG_PAGE_CACHE = False
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Страницы ошибок 403, 404 и 500 отрисовываются один раз и отдаются
+# готовыми байтами; перерисовываются только при изменении шаблонов
+PRERENDERED_ERROR_PAGES = False
+
+# Заранее собранные командой prerender_pages статические страницы
+# и срок их хранения в кэшах браузеров и прокси (с)
+STATIC_PAGES_ROOT = BASE_DIR / 'static_pages'
+
+STATIC_PAGES_MAX_AGE = 60 * 60 * 24
+
+# Статическая копия публичной части блога (команда build_static_site)
+STATIC_SITE_ROOT = BASE_DIR / 'static_site'
+
+# Теги объектов в ответах для кэширующего прокси и адрес, на который
+# отправляются теги изменившихся объектов (None — не отправлять)
+BLOG_SURROGATE_HEADER = 'Surrogate-Key'
+
+BLOG_PURGE_URL = None
+
+# Прогрев шаблонов и маршрутов при запуске процесса (см. warmup.py)
+WARM_UP_ON_STARTUP = False
+
+# Отрисовывать ленты и страницы постов шаблонами Jinja2
+# (нужен установленный jinja2)
+BLOG_JINJA2 = False
+
+# Отдавать страницу поста потоком: комментарии передаются пачками
+BLOG_STREAMING_DETAIL = False
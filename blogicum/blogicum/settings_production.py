@@ -0,0 +1,70 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE
+              if not middleware.startswith('debug_toolbar.')]
+
+# Шаблоны компилируются один раз на процесс и хранятся в памяти;
+# движок Jinja2, если он подключён, остаётся на своём месте
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}, *TEMPLATES[1:]]
+
+# Общий для процессов кэш: журнал фильтров Блума, поколения кэша
+# справочников, блокировки пересчёта и граф зависимостей страниц
+# работают только с ним. Адреса перечисляются через запятую,
+# по умолчанию это memcached.
+CACHE_BACKEND = os.environ.get(
+    'DJANGO_CACHE_BACKEND',
+    'django.core.cache.backends.memcached.PyMemcacheCache')
+CACHE_LOCATION = os.environ.get('DJANGO_CACHE_LOCATION')
+SHARED_CACHE = bool(CACHE_LOCATION) and not CACHE_BACKEND.endswith(
+    '.LocMemCache')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': CACHE_BACKEND,
+            'LOCATION': CACHE_LOCATION.split(','),
+        },
+    }
+
+BLOG_PAGE_CACHE = True
+
+PRERENDERED_ERROR_PAGES = True
+
+# Прогрев шаблонов, маршрутов и страниц ошибок при запуске процесса
+WARM_UP_ON_STARTUP = True
+
+BLOG_JINJA2 = os.environ.get('DJANGO_BLOG_JINJA2') == '1'
+
+if (BLOG_PAGE_CACHE or WARM_UP_ON_STARTUP) and not SHARED_CACHE:
+    raise ImproperlyConfigured(
+        'Кэш страниц и прогрев требуют общего кэша: задайте'
+        ' DJANGO_CACHE_LOCATION.')
+
+if BLOG_JINJA2 and not any(engine['BACKEND'].endswith('.Jinja2')
+                           for engine in TEMPLATES):
+    raise ImproperlyConfigured(
+        'Для DJANGO_BLOG_JINJA2 нужен установленный jinja2.')
@@ -1,9 +1,8 @@
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
 
-from blog import views
+from blog import media_serve, views
 
 
 urlpatterns = [
@@ -18,7 +17,10 @@ urlpatterns = [
     path('auth/registration/',
          views.RegistrationCreateView.as_view(),
          name='registration'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$',
+            media_serve.serve,
+            name='media'),
+]
 
 if settings.DEBUG:
     import debug_toolbar
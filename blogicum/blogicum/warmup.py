@@ -0,0 +1,56 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.template import engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def compile_templates():
+    """Загружает все шаблоны каталога templates/; с кэширующим
+    загрузчиком они остаются скомпилированными в памяти процесса.
+    Если страницы блога отрисовываются Jinja2, компилируются и его
+    шаблоны — с префиксом jinja2: в возвращаемом списке.
+    """
+    engine = engines['django']
+    names = sorted(
+        path.relative_to(settings.TEMPLATES_DIR).as_posix()
+        for path in settings.TEMPLATES_DIR.rglob('*.html'))
+    for name in names:
+        engine.get_template(name)
+    if settings.BLOG_JINJA2:
+        jinja = engines['jinja2']
+        for name in jinja.env.list_templates(extensions=['html']):
+            jinja.get_template(name)
+            names.append(f'jinja2:{name}')
+    return names
+
+
+def warm_up():
+    """Готовит процесс к первому запросу: шаблоны, маршруты,
+    страницы ошибок и фильтры несуществующих адресов.
+    """
+    from blog import bloom
+    from pages.error_pages import prerender_all
+
+    started = time.perf_counter()
+    templates = compile_templates()
+    # Первое обращение к reverse_dict строит таблицы маршрутов.
+    get_resolver().reverse_dict
+    if settings.PRERENDERED_ERROR_PAGES:
+        prerender_all()
+    try:
+        bloom.rebuild_all()
+    except DatabaseError:
+        logger.exception('Фильтры будут построены при первом запросе')
+    logger.info('Процесс прогрет за %.3f с, шаблонов: %d',
+                time.perf_counter() - started, len(templates))
+    return templates
+
+
+def warm_up_on_startup():
+    if settings.WARM_UP_ON_STARTUP:
+        warm_up()
@@ -0,0 +1,75 @@
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.autoreload import get_template_directories
+from django.utils.html import escape
+
+from blog.page_cache import fill_holes, render_skeleton
+
+# Не чаще раза в столько секунд проверяем, не изменились ли шаблоны
+TEMPLATES_CHECK_INTERVAL = 1
+
+# Метка на месте адреса запроса в заранее отрисованной странице
+URI_MARKER = '__request_uri__'
+
+_pages = {}
+_checked = {'at': float('-inf'), 'signature': None}
+_lock = threading.Lock()
+
+
+def _templates_signature():
+    """Время последнего изменения шаблонов проекта."""
+    now = time.monotonic()
+    if now - _checked['at'] >= TEMPLATES_CHECK_INTERVAL:
+        _checked['signature'] = max(
+            (path.stat().st_mtime_ns
+             for directory in get_template_directories()
+             for path in Path(directory).rglob('*.html')),
+            default=0)
+        _checked['at'] = now
+    return _checked['signature']
+
+
+def prerender(template_name):
+    """Отрисовывает страницу ошибки один раз: скелет с метками
+    {% hole %} и готовые байты для анонимных посетителей.
+    """
+    request = HttpRequest()
+    request.build_absolute_uri = lambda location=None: URI_MARKER
+    request.user = AnonymousUser()
+    skeleton = render_skeleton(request, template_name, {})
+    page = (_templates_signature(), skeleton,
+            fill_holes(skeleton, request).encode())
+    with _lock:
+        _pages[template_name] = page
+    return page
+
+
+def error_response(request, template_name, status):
+    """Страница ошибки из заранее отрисованных байтов.
+
+    Шаблон перерисовывается, только если шаблоны изменились. Данные
+    пользователя дорисовываются лишь при наличии сессии, а страница
+    500 всегда отдаётся готовой, без обращений к базе.
+    """
+    page = _pages.get(template_name)
+    if page is None or page[0] != _templates_signature():
+        page = prerender(template_name)
+    _, skeleton, content = page
+    if status != 500 and settings.SESSION_COOKIE_NAME in request.COOKIES:
+        content = fill_holes(skeleton, request).encode()
+    marker = URI_MARKER.encode()
+    if marker in content:
+        content = content.replace(
+            marker, escape(request.build_absolute_uri()).encode())
+    return HttpResponse(content, status=status)
+
+
+def prerender_all():
+    for template_name in ('pages/404.html', 'pages/403csrf.html',
+                          'pages/500.html'):
+        prerender(template_name)
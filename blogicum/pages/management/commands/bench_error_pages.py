@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = ('Измеряет пропускную способность страницы 404: обычная '
+            'отрисовка шаблона против заранее отрисованных байтов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Количество запросов в каждом прогоне.')
+        parser.add_argument('--path', default='/no-such-page/',
+                            help='Несуществующий адрес для запросов.')
+
+    def measure(self, path, requests, prerendered):
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'],
+                               PRERENDERED_ERROR_PAGES=prerendered):
+            client = Client()
+            client.get(path)
+            started = time.perf_counter()
+            for _ in range(requests):
+                response = client.get(path)
+            elapsed = time.perf_counter() - started
+        assert response.status_code == 404
+        return requests / elapsed
+
+    def handle(self, *args, **options):
+        rendered = self.measure(options['path'], options['requests'], False)
+        prerendered = self.measure(options['path'], options['requests'], True)
+        self.stdout.write(f'Отрисовка шаблона: {rendered:.0f} запросов/с')
+        self.stdout.write(f'Готовые байты: {prerendered:.0f} запросов/с')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение: {prerendered / rendered:.1f}x'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from pages.static_pages import build
+
+
+class Command(BaseCommand):
+    help = ('Отрисовывает страницы «О проекте» и «Правила» в сжатые '
+            'файлы для отдачи в обход шаблонов.')
+
+    def handle(self, *args, **options):
+        for target in build():
+            self.stdout.write(f'Собрана страница {target}')
+        self.stdout.write(self.style.SUCCESS('Готово'))
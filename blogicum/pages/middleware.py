@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+
+from .static_pages import STATIC_PAGES, load
+
+
+class StaticPagesMiddleware:
+    """Отдаёт заранее собранные статические страницы анонимным
+    посетителям в обход сессий, аутентификации и шаблонов.
+
+    Должен стоять в MIDDLEWARE раньше SessionMiddleware. Если страница
+    не собрана командой prerender_pages, запрос обрабатывается обычно.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = None
+
+    def __call__(self, request):
+        if self.paths is None:
+            self.paths = {reverse(url_name) for url_name in STATIC_PAGES}
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info in self.paths
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES):
+            page = load(request.path_info)
+            if page is not None:
+                return self.serve(request, *page)
+        return self.get_response(request)
+
+    def serve(self, request, content, compressed, etag):
+        gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+        if gzipped:
+            # У сжатой копии другие байты, значит и строгий ETag другой.
+            etag = f'{etag[:-1]}-gzip"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(compressed if gzipped else content)
+            if gzipped:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        # XFrameOptionsMiddleware стоит ниже и до ответа не доходит.
+        response['X-Frame-Options'] = settings.X_FRAME_OPTIONS.upper()
+        patch_vary_headers(response, ('Accept-Encoding', 'Cookie'))
+        patch_cache_control(response, public=True,
+                            max_age=settings.STATIC_PAGES_MAX_AGE)
+        return response
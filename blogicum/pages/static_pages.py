@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve, reverse
+
+# Страницы без данных из базы, которые можно отрисовать заранее
+STATIC_PAGES = ('pages:about', 'pages:rules')
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def page_file(path):
+    """Файл заранее отрисованной страницы для адреса path."""
+    name = path.strip('/').replace('/', '-') or 'index'
+    return Path(settings.STATIC_PAGES_ROOT) / f'{name}.html'
+
+
+@contextmanager
+def _atomic_file(target):
+    descriptor, temporary = tempfile.mkstemp(dir=target.parent)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            yield file
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, target)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def write_atomic(path, content, compress=True):
+    """Записывает content (байты или итератор байтов) и его сжатую
+    копию path.gz так, чтобы читатель никогда не увидел недописанный
+    файл. Итератор записывается по частям, не собираясь в памяти.
+    """
+    if isinstance(content, bytes):
+        content = [content]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with ExitStack() as stack:
+        files = [stack.enter_context(_atomic_file(path))]
+        if compress:
+            raw = stack.enter_context(
+                _atomic_file(path.with_name(path.name + '.gz')))
+            files.append(stack.enter_context(gzip.GzipFile(
+                filename='', mode='wb', fileobj=raw, mtime=0)))
+        for chunk in content:
+            for file in files:
+                file.write(chunk)
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def anonymous_request(url):
+    """GET-запрос анонимного посетителя к url, собранный без
+    тестового RequestFactory — как запрос страницы ошибки.
+    """
+    path, _, query = url.partition('?')
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.GET = QueryDict(query)
+    request.META = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': _host(),
+        'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    return request
+
+
+def render_page(url, streaming=False):
+    """Отрисовывает страницу так, как её видит анонимный посетитель.
+
+    С streaming=True представления, умеющие отдавать страницу потоком,
+    возвращают итератор байтов вместо готового содержимого.
+    """
+    request = anonymous_request(url)
+    request.streaming = streaming
+    request.resolver_match = match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+    if response.streaming:
+        return response.streaming_content
+    if hasattr(response, 'render'):
+        response.render()
+    return response.content
+
+
+def build():
+    """Отрисовывает все статические страницы; возвращает их файлы."""
+    files = []
+    for url_name in STATIC_PAGES:
+        path = reverse(url_name)
+        target = page_file(path)
+        write_atomic(target, render_page(path))
+        files.append(target)
+    return files
+
+
+def load(path):
+    """Содержимое, сжатая копия и ETag страницы или None, если
+    страница не собрана. Файлы перечитываются после пересборки.
+    """
+    target = page_file(path)
+    try:
+        mtime = target.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    page = _loaded.get(target)
+    if page is None or page[0] != mtime:
+        content = target.read_bytes()
+        compressed = target.with_name(target.name + '.gz').read_bytes()
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        page = (mtime, content, compressed, etag)
+        with _lock:
+            _loaded[target] = page
+    return page[1:]
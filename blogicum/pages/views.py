@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from .error_pages import error_response
+
 
 class About(TemplateView):
     template_name = 'pages/about.html'
@@ -10,13 +13,19 @@ class Rules(TemplateView):
     template_name = 'pages/rules.html'
 
 
+def error_page(request, template_name, status):
+    if settings.PRERENDERED_ERROR_PAGES:
+        return error_response(request, template_name, status)
+    return render(request, template_name, status=status)
+
+
 def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
+    return error_page(request, 'pages/404.html', 404)
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'pages/403csrf.html', status=403)
+    return error_page(request, 'pages/403csrf.html', 403)
 
 
 def server_error(request):
-    return render(request, 'pages/500.html', status=500)
+    return error_page(request, 'pages/500.html', 500)
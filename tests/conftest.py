@@ -41,6 +41,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """База очищается между тестами без сигналов моделей,
+    поэтому кэши тоже нужно сбрасывать."""
+    from django.core.cache import cache
+    from blog import lookup_cache
+
+    cache.clear()
+    lookup_cache.clear_local()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
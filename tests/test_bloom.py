@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from blog.bloom import BloomFilter, SharedMembership, category_slugs
+from blog.models import Category
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    for number in range(1000):
+        bloom.add(f'slug-{number}')
+    assert all(f'slug-{number}' in bloom for number in range(1000))
+    false_positives = sum(f'other-{number}' in bloom
+                          for number in range(10000))
+    assert false_positives < 300, (
+        "Убедитесь, что доля ложных срабатываний фильтра Блума"
+        " близка к заданной."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('url_name, kwargs', (
+    ('blog:category_posts', {'category_slug': 'no-such-category'}),
+    ('blog:profile', {'username': 'no-such-user'}),
+    ('blog:post_detail', {'post_id': 987654}),
+))
+def test_unknown_values_skip_database(client, published_category,
+                                      post_with_published_location,
+                                      django_assert_num_queries,
+                                      url_name, kwargs):
+    client.get(reverse(url_name, kwargs=kwargs))
+    with django_assert_num_queries(0):
+        response = client.get(reverse(url_name, kwargs=kwargs))
+    assert response.status_code == 404, (
+        "Убедитесь, что для несуществующих объектов возвращается 404"
+        " без обращений к базе данных."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_additions_reach_other_processes(published_category, mixer):
+    # Отдельный экземпляр с тем же пространством имён изображает
+    # другой процесс со своим фильтром.
+    other = SharedMembership('category_slugs', category_slugs.load_members)
+    assert other.might_contain(published_category.slug)
+    assert not other.might_contain('fresh-category')
+    category = mixer.blend(Category, slug='fresh-category')
+    assert other.might_contain(category.slug), (
+        "Убедитесь, что новые значения попадают в фильтры"
+        " других процессов."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_loaded_rows_are_found_after_reset(client, published_category):
+    url = reverse('blog:category_posts',
+                  kwargs={'category_slug': 'bulk-category'})
+    assert client.get(url).status_code == 404
+    # Отдельный экземпляр изображает другой процесс, уже построивший
+    # свой фильтр.
+    other = SharedMembership('category_slugs', category_slugs.load_members)
+    assert not other.might_contain('bulk-category')
+    # bulk_create не вызывает сигналов и не пишет в журнал добавлений.
+    Category.objects.bulk_create([Category(
+        title='Пакетная', description='Пакетная', slug='bulk-category',
+        is_published=True)])
+    call_command('reset_bloom_filters')
+    assert other.might_contain('bulk-category'), (
+        "Убедитесь, что после сброса фильтры всех процессов видят"
+        " строки, добавленные мимо сигналов."
+    )
+    assert client.get(url).status_code == 200
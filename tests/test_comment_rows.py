@@ -0,0 +1,43 @@
+import csv
+import io
+
+import pytest
+
+from blog.comment_rows import comment_rows
+from blog.models import Comment
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_rows_are_lightweight(mixer, user,
+                                      post_with_published_location,
+                                      django_assert_num_queries):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend(Comment, post=post, author=user)
+    with django_assert_num_queries(1):
+        rows = list(comment_rows(post.comments.all(), chunk_size=2))
+    assert [row.id for row in rows] == [comment.id for comment in comments]
+    assert not any(isinstance(row, Comment) for row in rows), (
+        "Убедитесь, что комментарии читаются лёгкими строками, а не"
+        " экземплярами модели."
+    )
+    assert rows[0].author.username == user.username
+    assert rows[0].text_html == comments[0].text_html
+
+
+@pytest.mark.django_db(transaction=True)
+def test_admin_exports_comments_as_csv(admin_client, mixer, user,
+                                       post_with_published_location):
+    comments = mixer.cycle(3).blend(
+        Comment, post=post_with_published_location, author=user)
+    response = admin_client.post('/admin/blog/comment/', {
+        'action': 'export_csv',
+        '_selected_action': [comment.pk for comment in comments],
+    })
+    assert response.streaming, (
+        "Убедитесь, что выгрузка комментариев отдаётся потоком."
+    )
+    content = b''.join(response.streaming_content).decode()
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows[0] == ['id', 'post_id', 'author', 'created_at', 'text']
+    assert [int(row[0]) for row in rows[1:]] == [c.pk for c in comments]
+    assert rows[1][2] == user.username
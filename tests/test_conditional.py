@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def _revalidate(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('ETag'), (
+        f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+    )
+    return response['ETag'], client.get(
+        url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_not_modified(user_client, another_user_client,
+                                  post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag, response = _revalidate(user_client, url)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившаяся страница поста отдаётся"
+        " со статусом 304."
+    )
+
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag страницы поста зависит от пользователя."
+    )
+
+    user_client.post(f'{url}comment/', data={'text': 'Новый комментарий'})
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после добавления комментария ETag страницы поста"
+        " меняется."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_etag_follows_post_changes(user_client,
+                                               post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag, _ = _revalidate(user_client, url)
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listings_not_modified(client, mixer, user,
+                               post_with_published_location):
+    category = post_with_published_location.category
+    urls = (
+        '/',
+        f'/category/{category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    etags = {}
+    for url in urls:
+        etags[url], response = _revalidate(client, url)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отдаётся"
+            " со статусом 304."
+        )
+    # Единственная страница: ?page=2 показывает её же.
+    assert client.get('/?page=2')['ETag'] == etags['/']
+
+    mixer.blend('blog.Post', author=user, category=category)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после новой публикации ETag страницы `{url}`"
+            " меняется."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_profile_etag_follows_name_change(user_client, user,
+                                          post_with_published_location):
+    url = f'/profile/{user.username}/'
+    etag, response = _revalidate(user_client, url)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    user.first_name = 'Новое имя'
+    user.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после смены имени автора ETag его страницы"
+        " меняется."
+    )
+    assert 'Новое имя' in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listing_etag_uses_validated_page(client, user,
+                                          many_posts_with_published_locations):
+    category = many_posts_with_published_locations[0].category
+    for url in ('/', f'/category/{category.slug}/',
+                f'/profile/{user.username}/'):
+        first = client.get(url)['ETag']
+        response = client.get(f'{url}?page=%0Afoo')
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что страница `{url}` с неверным номером страницы"
+            " не падает."
+        )
+        assert response['ETag'] == first
+        second = client.get(f'{url}?page=2')['ETag']
+        assert second != first
+        assert client.get(f'{url}?page=99')['ETag'] == second
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.counters import feed_count
+from blog.models import FeedCounter, Post
+
+
+def _counts(category, author):
+    return (
+        feed_count(FeedCounter.GLOBAL),
+        feed_count(FeedCounter.CATEGORY, category.id),
+        feed_count(FeedCounter.AUTHOR, author.id),
+        feed_count(FeedCounter.AUTHOR, author.id, published=False),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counters_follow_post_changes(mixer, user, published_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    assert _counts(published_category, user) == (1, 1, 1, 1), (
+        "Убедитесь, что опубликованный пост учитывается во всех лентах."
+    )
+
+    post.is_published = False
+    post.save()
+    assert _counts(published_category, user) == (0, 0, 0, 1), (
+        "Убедитесь, что снятый с публикации пост не учитывается"
+        " в счётчиках опубликованных постов."
+    )
+
+    post.is_published = True
+    post.save()
+    published_category.is_published = False
+    published_category.save()
+    assert _counts(published_category, user) == (0, 0, 0, 1), (
+        "Убедитесь, что посты снятой с публикации категории не учитываются"
+        " в счётчиках опубликованных постов."
+    )
+
+    post.delete()
+    assert _counts(published_category, user) == (0, 0, 0, 0), (
+        "Убедитесь, что удалённый пост не учитывается в счётчиках."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counters_category_change(mixer, user, published_category,
+                                  another_category):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    post.category = another_category
+    post.save()
+    assert feed_count(FeedCounter.CATEGORY, published_category.id) == 0
+    assert feed_count(FeedCounter.CATEGORY, another_category.id) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counters_deferred_go_live(mixer, user, published_category):
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=timezone.now() + timedelta(days=1))
+    assert feed_count(FeedCounter.GLOBAL) == 0
+    # Сдвигаем даты в прошлое, как будто время публикации наступило.
+    past = timezone.now() - timedelta(minutes=1)
+    Post.objects.update(pub_date=past)
+    FeedCounter.objects.filter(scope=FeedCounter.GLOBAL).update(
+        next_go_live=past)
+    assert feed_count(FeedCounter.GLOBAL) == 1, (
+        "Убедитесь, что отложенный пост учитывается в счётчиках после"
+        " наступления даты публикации."
+    )
+    assert feed_count(FeedCounter.AUTHOR, user.id) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reconcile_counters(mixer, user, published_category):
+    mixer.cycle(3).blend('blog.Post', author=user,
+                         category=published_category)
+    Post.objects.update(is_counted=False)
+    FeedCounter.objects.all().delete()
+    FeedCounter.objects.create(scope=FeedCounter.GLOBAL, published=42)
+    call_command('reconcile_counters')
+    assert _counts(published_category, user) == (3, 3, 3, 3)
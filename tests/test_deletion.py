@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test.utils import CaptureQueriesContext
+
+from blog.counters import feed_count
+from blog.deletion import purge_deleted
+from blog.models import Comment, FeedCounter, Post, User
+
+
+def _delete_post_queries(client, post):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(f'/posts/{post.pk}/delete/')
+    assert response.status_code == 302
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_delete_is_soft(mixer, user, user_client, published_category):
+    small, large = mixer.cycle(2).blend(
+        Post, author=user, category=published_category)
+    mixer.cycle(2).blend(Comment, post=small, author=user)
+    mixer.cycle(40).blend(Comment, post=large, author=user)
+
+    assert _delete_post_queries(user_client, large) == (
+        _delete_post_queries(user_client, small)), (
+        "Убедитесь, что число запросов при удалении публикации не растёт"
+        " с числом комментариев."
+    )
+    assert not Post.objects.exists()
+    assert Post.all_objects.count() == 2, (
+        "Убедитесь, что удаление публикации только помечает её удалённой."
+    )
+    assert feed_count(FeedCounter.GLOBAL, published=False) == 0
+    assert feed_count(FeedCounter.AUTHOR, user.id, published=False) == 0
+    assert user_client.get(f'/posts/{large.pk}/').status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_purge_does_not_load_comments(mixer, user, user_client,
+                                      post_with_published_location):
+    post = post_with_published_location
+    image = post.image
+    assert image.storage.exists(image.name)
+    # Свежие файлы очистка не трогает: их могли загрузить повторно.
+    hours_ago = time.time() - 2 * 60 * 60
+    os.utime(image.path, (hours_ago, hours_ago))
+    roots = mixer.cycle(20).blend(Comment, post=post, author=user)
+    mixer.cycle(20).blend(Comment, post=post, author=user,
+                          parent=(root for root in roots))
+    kept_post = mixer.blend(Post, author=user)
+    kept = mixer.blend(Comment, post=kept_post, author=user)
+    deleted = mixer.blend(Comment, post=kept_post, author=user)
+    user_client.post(f'/posts/{post.pk}/delete/')
+    user_client.post(f'/posts/{kept_post.pk}/delete_comment/{deleted.pk}')
+    loaded = []
+
+    def remember(sender, instance, **kwargs):
+        loaded.append(instance)
+
+    post_init.connect(remember, sender=Comment)
+    try:
+        purged = purge_deleted(batch_size=7, pause=0)
+    finally:
+        post_init.disconnect(remember, sender=Comment)
+    assert not loaded, (
+        "Убедитесь, что очистка не загружает комментарии в память."
+    )
+    assert purged == (1, 1)
+    assert list(Post.all_objects.all()) == [kept_post]
+    assert list(Comment.all_objects.all()) == [kept]
+    assert not image.storage.exists(image.name), (
+        "Убедитесь, что очистка удаляет картинки удалённых публикаций."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_admin_deletes_user_with_content(admin_client, mixer, user,
+                                         another_user, published_category):
+    own_post = mixer.blend(Post, author=user, category=published_category)
+    other_post = mixer.blend(Post, author=another_user,
+                             category=published_category)
+    mixer.cycle(3).blend(Comment, post=own_post, author=another_user)
+    comment = mixer.blend(Comment, post=other_post, author=user)
+    mixer.blend(Comment, post=other_post, author=another_user,
+                parent=comment)
+    kept = mixer.blend(Comment, post=other_post, author=another_user)
+    generation = other_post.comments_generation
+
+    response = admin_client.get(f'/admin/auth/user/{user.pk}/delete/')
+    assert response.status_code == 200
+    response = admin_client.post(f'/admin/auth/user/{user.pk}/delete/',
+                                 {'post': 'yes'})
+    assert response.status_code == 302
+
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert list(Post.objects.all()) == [other_post]
+    assert list(Comment.objects.all()) == [kept], (
+        "Убедитесь, что вместе с пользователем удаляются его публикации,"
+        " комментарии и ответы на них."
+    )
+    other_post.refresh_from_db()
+    assert other_post.comments_generation > generation
+    assert feed_count(FeedCounter.GLOBAL, published=False) == 1
+    assert feed_count(FeedCounter.CATEGORY, published_category.id,
+                      published=False) == 1
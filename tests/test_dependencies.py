@@ -0,0 +1,112 @@
+import pytest
+from django.test import override_settings
+
+from blog import dependencies
+from blog.dependencies import pages_invalidated
+from blog.models import Comment
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    with override_settings(BLOG_PAGE_CACHE=True):
+        yield
+
+
+@pytest.fixture
+def invalidated():
+    pages = set()
+
+    def receiver(sender, pages=(), **kwargs):
+        invalidated_pages.update(pages)
+
+    invalidated_pages = pages
+    pages_invalidated.connect(receiver, weak=False,
+                              dispatch_uid='test_invalidated')
+    yield pages
+    pages_invalidated.disconnect(dispatch_uid='test_invalidated')
+
+
+def visit(client, *urls):
+    for url in urls:
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+def test_category_unpublish(client, invalidated, mixer,
+                            post_with_published_location,
+                            post_with_another_category):
+    post = post_with_published_location
+    other = post_with_another_category
+    visit(client, '/', f'/posts/{post.pk}/', f'/posts/{other.pk}/',
+          f'/category/{post.category.slug}/',
+          f'/category/{other.category.slug}/')
+    invalidated.clear()
+    post.category.is_published = False
+    post.category.save()
+    assert {'/', f'/posts/{post.pk}/',
+            f'/category/{post.category.slug}/'} <= invalidated, (
+        "Убедитесь, что снятие категории с публикации сбрасывает"
+        " её страницу, страницы её постов и ленты с ними."
+    )
+    assert f'/posts/{other.pk}/' not in invalidated
+    assert f'/category/{other.category.slug}/' not in invalidated, (
+        "Убедитесь, что сбрасываются только зависимые страницы."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_author_rename(client, invalidated, mixer, user, another_user,
+                       post_with_published_location):
+    post = post_with_published_location
+    foreign = mixer.blend('blog.Post', author=another_user,
+                          category=post.category, location=None)
+    visit(client, f'/posts/{post.pk}/', f'/posts/{foreign.pk}/',
+          f'/profile/{user.username}/',
+          f'/profile/{another_user.username}/')
+    invalidated.clear()
+    old_profile = f'/profile/{user.username}/'
+    user.username = 'renamed'
+    user.save()
+    assert {f'/posts/{post.pk}/', old_profile} <= invalidated, (
+        "Убедитесь, что переименование автора сбрасывает его профиль"
+        " и страницы его постов."
+    )
+    assert f'/posts/{foreign.pk}/' not in invalidated
+    assert f'/profile/{another_user.username}/' not in invalidated
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_delete(client, invalidated, mixer, user,
+                        post_with_published_location,
+                        post_with_another_category):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post, author=user)
+    visit(client, f'/posts/{post.pk}/',
+          f'/posts/{post_with_another_category.pk}/')
+    invalidated.clear()
+    comment.delete()
+    assert f'/posts/{post.pk}/' in invalidated, (
+        "Убедитесь, что удаление комментария сбрасывает страницу поста."
+    )
+    assert f'/posts/{post_with_another_category.pk}/' not in invalidated
+
+
+def test_register_keeps_every_page_and_is_bounded(monkeypatch):
+    monkeypatch.setattr(dependencies, 'DEPENDENCIES_MAX_PAGES', 3)
+    tags = {'post:test-register'}
+    dependencies.register(tags, '/first/')
+    dependencies.register(tags, '/second/')
+    dependencies.register(tags, '/first/')
+    assert dependencies.pages_for(tags) == {'/first/', '/second/'}, (
+        "Убедитесь, что регистрация страниц за тегом не теряет"
+        " и не повторяет записи."
+    )
+    for number in range(10):
+        dependencies.register(tags, f'/?page={number}')
+    assert len(dependencies.pages_for(tags)) == 3, (
+        "Убедитесь, что число страниц за тегом ограничено."
+    )
+    dependencies.invalidate_tags(None, tags)
+    assert dependencies.pages_for(tags) == set()
+    dependencies.register(tags, '/first/')
+    assert dependencies.pages_for(tags) == {'/first/'}
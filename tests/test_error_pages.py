@@ -0,0 +1,51 @@
+import pytest
+from django.test import override_settings
+
+from pages import error_pages
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+prerendered = override_settings(DEBUG=False, PRERENDERED_ERROR_PAGES=True)
+
+
+@prerendered
+def test_prerendered_404_skips_templates(client, monkeypatch,
+                                         django_assert_num_queries):
+    client.get('/no-such-page/')
+    renders = []
+    monkeypatch.setattr(error_pages, 'render_skeleton',
+                        lambda *args: renders.append(args))
+    with django_assert_num_queries(0):
+        response = client.get('/another-missing-page/')
+    assert response.status_code == 404
+    assert not renders, (
+        "Убедитесь, что страница 404 отдаётся заранее отрисованной."
+    )
+    content = response.content.decode()
+    assert 'Страница не найдена' in content
+    assert 'http://testserver/another-missing-page/' in content, (
+        "Убедитесь, что в заранее отрисованную страницу 404 подставляется"
+        " адрес запроса."
+    )
+
+
+@prerendered
+def test_prerendered_404_shows_user(user_client, user):
+    response = user_client.get('/no-such-page/')
+    assert response.status_code == 404
+    assert user.username in response.content.decode(), (
+        "Убедитесь, что заранее отрисованная страница 404 показывает"
+        " залогиненному пользователю его меню."
+    )
+
+
+@prerendered
+def test_prerendered_page_follows_template_changes(client, monkeypatch):
+    client.get('/no-such-page/')
+    monkeypatch.setattr(error_pages, '_templates_signature', lambda: -1)
+    monkeypatch.setattr(error_pages, 'fill_holes',
+                        lambda skeleton, request: 'Новый шаблон')
+    response = client.get('/no-such-page/')
+    assert response.content.decode() == 'Новый шаблон', (
+        "Убедитесь, что страница перерисовывается после изменения шаблонов."
+    )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('url', ['/feeds/rss/', '/feeds/atom/'])
+def test_posts_feed(client, post_with_published_location,
+                    posts_with_unpublished_category, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode('utf-8')
+    assert post_with_published_location.title in content, (
+        "Убедитесь, что опубликованный пост попадает в ленту."
+    )
+    for post in posts_with_unpublished_category:
+        assert post.title not in content, (
+            "Убедитесь, что посты из снятой с публикации категории"
+            " не попадают в ленту."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_category_and_author_feeds(client, post_with_published_location,
+                                   post_with_another_category):
+    category = post_with_published_location.category
+    content = client.get(f'/category/{category.slug}/rss/').content.decode()
+    assert post_with_published_location.title in content
+    assert post_with_another_category.title not in content
+
+    author = post_with_published_location.author
+    content = client.get(f'/profile/{author.username}/atom/').content.decode()
+    assert post_with_published_location.title in content
+
+    response = client.get('/category/no-such-category/rss/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_conditional_get(client, mixer, user, published_category,
+                              post_with_published_location):
+    response = client.get('/feeds/rss/')
+    etag = response['ETag']
+    assert response.has_header('Last-Modified')
+
+    response = client.get('/feeds/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившаяся лента отдаётся со статусом 304."
+    )
+
+    mixer.blend('blog.Post', author=user, category=published_category)
+    response = client.get('/feeds/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после новой публикации ETag ленты меняется."
+    )
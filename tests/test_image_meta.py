@@ -0,0 +1,75 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import FeedCounter, Post
+
+
+def _image(size):
+    data = BytesIO()
+    Image.new('RGB', size, color='green').save(data, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', data.getvalue())
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_meta_is_read_once(mixer, user):
+    post = mixer.blend(Post, author=user, image=_image((320, 200)))
+    meta = post.image_meta
+    assert (meta['width'], meta['height']) == (320, 200), (
+        "Убедитесь, что размеры картинки сохраняются при загрузке."
+    )
+    assert meta['placeholder'].startswith('data:image/jpeg;base64,')
+    assert len(meta['placeholder']) < 1024
+
+    post.image.storage.delete(post.image.name)
+    post.title = 'Другое название'
+    post.save()
+    assert post.image_meta == meta, (
+        "Убедитесь, что картинка не перечитывается, если она не менялась."
+    )
+
+    post.image = ''
+    post.save()
+    assert post.image_meta == {}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_card_markup(client, mixer, user, published_category):
+    post = mixer.blend(Post, author=user, category=published_category,
+                       is_published=True, image=_image((320, 200)))
+    content = client.get('/').content.decode()
+    assert 'width="320" height="200"' in content, (
+        "Убедитесь, что в карточке поста у картинки указаны размеры."
+    )
+    assert 'loading="lazy"' in content
+    assert 'decoding="async"' in content
+    assert post.image_meta['placeholder'] in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill(mixer, user):
+    post = mixer.blend(Post, author=user, image=_image((64, 48)))
+    Post.objects.filter(pk=post.pk).update(image_meta={})
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    generation = FeedCounter.objects.get(
+        scope=FeedCounter.AUTHOR, object_id=user.pk).generation
+    call_command('backfill_image_meta', workers=2)
+    post.refresh_from_db()
+    assert (post.image_meta['width'], post.image_meta['height']) == (64, 48), (
+        "Убедитесь, что команда заполняет сведения о старых картинках."
+    )
+    assert post.updated_at > updated_at
+    assert FeedCounter.objects.get(
+        scope=FeedCounter.AUTHOR, object_id=user.pk
+    ).generation > generation, (
+        "Убедитесь, что после заполнения сведений о картинках меняются"
+        " ETag страниц и лент с этими публикациями."
+    )
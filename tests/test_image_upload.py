@@ -0,0 +1,130 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from PIL import Image
+
+from blog import image_upload
+from blog.models import Post
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _image(size, image_format='JPEG', **params):
+    data = BytesIO()
+    Image.new('RGB', size, color='red').save(data, image_format, **params)
+    return data.getvalue()
+
+
+def _create(client, category, content, name='photo.jpg'):
+    return client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01 10:00',
+        'category': category.pk,
+        'image': SimpleUploadedFile(name, content),
+    })
+
+
+def _image_errors(response):
+    assert response.status_code == 200
+    assert not Post.objects.exists()
+    return response.context['form'].errors['image']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bogus_file_rejected_by_magic_bytes(user_client,
+                                            published_category, monkeypatch):
+    checked = []
+    monkeypatch.setattr(image_upload.Image, 'open', checked.append)
+    response = _create(user_client, published_category,
+                       b'<?php echo 1; ?>' * 1000)
+    assert _image_errors(response) == [image_upload.FORMAT_ERROR], (
+        "Убедитесь, что файл с неподходящей сигнатурой отклоняется."
+    )
+    assert not checked, (
+        "Убедитесь, что сигнатура проверяется до разбора файла Pillow."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_oversized_dimensions_rejected_from_header(user_client,
+                                                   published_category):
+    content = _image((image_upload.IMAGE_MAX_SIDE + 1, 1), 'PNG')
+    response = _create(user_client, published_category, content, 'wide.png')
+    assert _image_errors(response) == [image_upload.DIMENSIONS_ERROR]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_size_limit_enforced_mid_stream(user_client, published_category,
+                                        monkeypatch, tmp_path):
+    monkeypatch.setattr(image_upload, 'IMAGE_UPLOAD_MAX_SIZE', 100 * 1024)
+    data = BytesIO()
+    Image.frombytes('RGB', (400, 400), os.urandom(400 * 400 * 3)).save(
+        data, 'PNG')
+    response = _create(user_client, published_category, data.getvalue(),
+                       'noise.png')
+    assert _image_errors(response) == [image_upload.SIZE_ERROR], (
+        "Убедитесь, что слишком большой файл отклоняется во время"
+        " загрузки."
+    )
+    assert not list(tmp_path.rglob('*.png'))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_exif_is_stripped_and_applied(user_client, published_category):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010f] = 'Camera'
+    response = _create(user_client, published_category,
+                       _image((40, 20), exif=exif.tobytes()))
+    assert response.status_code == 302
+    post = Post.objects.get()
+    with post.image.open('rb'), Image.open(post.image) as stored:
+        assert stored.size == (20, 40), (
+            "Убедитесь, что картинка поворачивается по EXIF Orientation."
+        )
+        assert not stored.getexif(), (
+            "Убедитесь, что из загруженной картинки удаляются метаданные"
+            " EXIF."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('image_format, name', (
+    ('PNG', 'clear.png'),
+    ('GIF', 'clear.gif'),
+))
+def test_transparency_is_kept(user_client, published_category,
+                              image_format, name):
+    image = Image.new('P', (10, 10), color=0)
+    image.putpalette([255, 0, 0, 0, 0, 255])
+    image.putpixel((0, 0), 1)
+    data = BytesIO()
+    image.save(data, image_format, transparency=0,
+               comment=b'Camera' if image_format == 'GIF' else None)
+    response = _create(user_client, published_category, data.getvalue(),
+                       name)
+    assert response.status_code == 302
+    post = Post.objects.get()
+    with post.image.open('rb'), Image.open(post.image) as stored:
+        assert stored.info.get('transparency') == 0, (
+            "Убедитесь, что при перекодировании картинки сохраняется"
+            " прозрачность."
+        )
+        assert 'comment' not in stored.info
+
+
+@pytest.mark.django_db(transaction=True)
+def test_csrf_still_checked(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = _create(client, published_category, _image((10, 10)))
+    assert response.status_code == 403, (
+        "Убедитесь, что страница создания поста проверяет CSRF-токен."
+    )
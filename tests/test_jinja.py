@@ -0,0 +1,44 @@
+import re
+
+import pytest
+from django.test import override_settings
+
+pytest.importorskip('jinja2')
+
+
+def normalized(response):
+    # Маскированный CSRF-токен отличается от запроса к запросу.
+    content = re.sub(r'name="csrfmiddlewaretoken" value="\w+"', '',
+                     response.content.decode())
+    return re.sub(r'\s+', ' ', content).replace('> <', '><').strip()
+
+
+@pytest.fixture
+def pages(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(12).blend('blog.Post', author=user, category=post.category,
+                          location=None, is_published=True,
+                          text='Первая строка\n<b>вторая</b> ' * 10)
+    root = mixer.blend('blog.Comment', post=post, author=user,
+                       text='Комментарий\n<i>с разметкой</i>')
+    # Ответов больше, чем показывается под веткой, и ответ на ответ:
+    # страница содержит обе ссылки на непоказанные ответы.
+    replies = mixer.cycle(4).blend('blog.Comment', post=post, author=user,
+                                   parent=root)
+    mixer.blend('blog.Comment', post=post, author=user, parent=replies[0])
+    return ('/', '/?page=2', f'/category/{post.category.slug}/',
+            f'/profile/{user.username}/', f'/posts/{post.pk}/')
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('page_cache', (False, True))
+def test_jinja2_pages_match_django(pages, user_client, page_cache):
+    with override_settings(BLOG_PAGE_CACHE=page_cache):
+        for url in pages:
+            django_page = normalized(user_client.get(url))
+            with override_settings(BLOG_JINJA2=True):
+                jinja_page = normalized(user_client.get(url))
+            assert jinja_page == django_page, (
+                f"Убедитесь, что страница `{url}` в Jinja2 совпадает"
+                " со страницей, отрисованной шаблонами Django."
+            )
@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+
+from blog import lookup_cache
+from blog.lookup_cache import TwoTierCache
+from blog.models import Category
+
+
+@pytest.mark.django_db(transaction=True)
+def test_l1_hit_skips_database(published_category,
+                               django_assert_num_queries):
+    lookup_cache.category_by_slug(published_category.slug)
+    with django_assert_num_queries(0):
+        category = lookup_cache.category_by_slug(published_category.slug)
+    assert category == published_category
+    assert lookup_cache.categories.stats()['l1_hits'] >= 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generation_invalidates_other_processes(published_category):
+    # Два экземпляра с одним пространством имён имитируют два процесса:
+    # у каждого свой L1, общий L2.
+    first = TwoTierCache('category', l1_ttl=0)
+    second = TwoTierCache('category', l1_ttl=0)
+
+    def load():
+        return Category.objects.get(pk=published_category.pk)
+
+    assert first.get('test', load).title == published_category.title
+    assert second.get('test', load).title == published_category.title
+    assert second.stats()['l2_hits'] == 1, (
+        "Убедитесь, что второй процесс берёт объект из общего кэша."
+    )
+
+    published_category.title = 'Новое название'
+    published_category.save()
+    assert first.get('test', load).title == 'Новое название', (
+        "Убедитесь, что изменение объекта сбрасывает кэш во всех"
+        " процессах через счётчик поколения."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_lookups_check_generation_within_l1_ttl(published_category):
+    lookup_cache.category_by_slug(published_category.slug)
+    # Другой процесс меняет категорию: у этого процесса остаётся
+    # копия в L1, сдвигается только общее поколение.
+    Category.objects.filter(pk=published_category.pk).update(
+        title='Новое название')
+    cache.incr(lookup_cache.categories.generation_key)
+    category = lookup_cache.category_by_slug(published_category.slug)
+    assert category.title == 'Новое название', (
+        "Убедитесь, что копия из L1 сверяется с поколением, прежде чем"
+        " попасть в страницу."
+    )
+
+
+def test_l1_is_bounded():
+    lookup = TwoTierCache('bounded-test', max_entries=3)
+    for number in range(10):
+        lookup.get(number, lambda: number)
+    stats = lookup.stats()
+    assert stats['size'] == 3
+    assert stats['evictions'] == 7
+    assert stats['misses'] == 10
+
+
+def test_missing_objects_are_cached():
+    lookup = TwoTierCache('missing-test')
+    calls = []
+    for _ in range(3):
+        assert lookup.get('absent', lambda: calls.append(1)) is None
+    assert len(calls) == 1
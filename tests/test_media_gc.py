@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+
+from blog.media_gc import collect_garbage
+from blog.models import Post
+from blog.uploads import image_upload_to
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    hour_ago = time.time() - 2 * 60 * 60
+
+    def create(name, old=True):
+        path = settings.MEDIA_ROOT / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'image')
+        if old:
+            os.utime(path, (hour_ago, hour_ago))
+        return path
+
+    return create
+
+
+@pytest.mark.django_db(transaction=True)
+def test_orphans_are_collected(media, mixer, user, tmp_path):
+    kept = media('posts_images/aa/bb/kept.jpg')
+    mixer.blend(Post, author=user, image='posts_images/aa/bb/kept.jpg')
+    orphan = media('posts_images/cc/dd/orphan.jpg')
+    fresh = media('posts_images/cc/dd/fresh.jpg', old=False)
+
+    stats = collect_garbage(dry_run=True)
+    assert (stats['scanned'], stats['orphaned']) == (3, 1)
+    assert orphan.exists(), (
+        "Убедитесь, что пробный запуск ничего не удаляет."
+    )
+
+    call_command('gc_media', quarantine=str(tmp_path / 'quarantine'))
+    assert not orphan.exists()
+    assert (tmp_path / 'quarantine/posts_images/cc/dd/orphan.jpg').exists()
+    assert kept.exists()
+    assert fresh.exists(), (
+        "Убедитесь, что недавно загруженные файлы не удаляются."
+    )
+
+
+def test_upload_to_leaves_sharding_to_storage():
+    assert image_upload_to(None, 'photo.jpg') == 'posts_images/photo.jpg', (
+        "Убедитесь, что upload_to не тратит время на случайные каталоги:"
+        " их выбирает хранилище по хэшу содержимого."
+    )
@@ -0,0 +1,112 @@
+import hashlib
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_OFFLOAD = None
+    return tmp_path
+
+
+@pytest.fixture
+def hashed_url(media_root):
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    name = f'posts_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+    path = media_root / name
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    return f'/media/{name}'
+
+
+def _body(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_content_addressed_file_is_immutable(client, hashed_url):
+    response = client.get(hashed_url)
+    assert response.status_code == 200
+    assert _body(response) == CONTENT
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'immutable' in response['Cache-Control'], (
+        "Убедитесь, что картинки с именем из хэша кэшируются"
+        " как неизменяемые."
+    )
+    assert response['ETag'] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+    response = client.get(hashed_url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 304
+    response = client.get(hashed_url,
+                          HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_other_files_are_revalidated(client, media_root):
+    (media_root / 'old.png').write_bytes(CONTENT)
+    response = client.get('/media/old.png')
+    assert response.status_code == 200
+    assert 'immutable' not in response['Cache-Control']
+    assert response.has_header('ETag')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=0-9', 0, 9),
+    ('bytes=1000-', 1000, 1023),
+    ('bytes=-24', 1000, 1023),
+    ('bytes=1020-5000', 1020, 1023),
+])
+def test_range(client, hashed_url, header, start, end):
+    response = client.get(hashed_url, HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        "Убедитесь, что поддерживаются запросы с заголовком Range."
+    )
+    assert _body(response) == CONTENT[start:end + 1]
+    assert response['Content-Length'] == str(end - start + 1)
+    assert response['Content-Range'] == f'bytes {start}-{end}/{len(CONTENT)}'
+
+
+@pytest.mark.django_db
+def test_unsatisfiable_and_stale_ranges(client, hashed_url):
+    response = client.get(hashed_url, HTTP_RANGE='bytes=2000-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+    response = client.get(hashed_url, HTTP_RANGE='bytes=0-9',
+                          HTTP_IF_RANGE='"outdated"')
+    assert response.status_code == 200
+    assert _body(response) == CONTENT
+
+    response = client.get(hashed_url, HTTP_RANGE='bytes=0-1,5-6')
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_offload(client, settings, hashed_url):
+    settings.MEDIA_OFFLOAD = 'X-Accel-Redirect'
+    response = client.get(hashed_url)
+    assert response.status_code == 200
+    assert response['X-Accel-Redirect'] == (
+        settings.MEDIA_ACCEL_PREFIX + hashed_url[len('/media/'):]), (
+        "Убедитесь, что при включённой разгрузке файл отдаёт веб-сервер."
+    )
+    assert not response.content
+    assert 'immutable' in response['Cache-Control']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    '/media/missing.jpg',
+    '/media/posts_images',
+    '/media/posts_images/.upload-tmp',
+    '/media/../db.sqlite3',
+])
+def test_not_found(client, hashed_url, media_root, url):
+    (media_root / 'posts_images' / '.upload-tmp').write_bytes(CONTENT)
+    assert client.get(url).status_code == 404
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from blog import page_cache as page_cache_module
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    cache.clear()
+    with override_settings(BLOG_PAGE_CACHE=True):
+        yield
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_skeleton_is_shared_between_users(
+        user, another_user, user_client, another_user_client,
+        unlogged_client, post_with_published_location,
+        django_assert_max_num_queries):
+    url = f'/posts/{post_with_published_location.id}/'
+    edit_url = f'/posts/{post_with_published_location.id}/edit/'
+
+    anonymous = unlogged_client.get(url).content.decode()
+    assert 'Войти' in anonymous
+    assert edit_url not in anonymous
+    assert 'csrfmiddlewaretoken' not in anonymous
+
+    author = user_client.get(url).content.decode()
+    assert f'>{user.username}</a>' in author, (
+        "Убедитесь, что в шапке закэшированной страницы отображается"
+        " имя текущего пользователя."
+    )
+    assert edit_url in author, (
+        "Убедитесь, что автор видит ссылки редактирования поста на"
+        " закэшированной странице."
+    )
+    assert 'csrfmiddlewaretoken' in author
+
+    with django_assert_max_num_queries(4):
+        other = another_user_client.get(url).content.decode()
+    assert f'>{another_user.username}</a>' in other
+    assert f'>{user.username}</a>' not in other
+    assert edit_url not in other
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cached_page_follows_changes(user_client, mixer, user,
+                                     post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    user_client.get(url)
+    user_client.post(f'{url}comment/', data={'text': 'Свежий комментарий'})
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Свежий комментарий' in response.content.decode(), (
+        "Убедитесь, что новый комментарий появляется на закэшированной"
+        " странице поста."
+    )
+
+    user_client.get('/')
+    post = mixer.blend('blog.Post', author=user,
+                       category=post_with_published_location.category)
+    assert post.title in user_client.get('/').content.decode(), (
+        "Убедитесь, что новая публикация появляется в закэшированной"
+        " ленте."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.filterwarnings(
+    'error::django.core.cache.backends.base.CacheKeyWarning')
+def test_page_keys_use_page_number(client, monkeypatch, user,
+                                   post_with_published_location):
+    keys = set()
+    get_or_compute = page_cache_module.get_or_compute
+
+    def remember(key, *args, **kwargs):
+        keys.add(key)
+        return get_or_compute(key, *args, **kwargs)
+
+    monkeypatch.setattr(page_cache_module, 'get_or_compute', remember)
+    category = post_with_published_location.category
+    for url in ('/', f'/category/{category.slug}/',
+                f'/profile/{user.username}/'):
+        for page in ('a%20b', '%0A', 'x' * 300, '2', '1'):
+            assert client.get(f'{url}?page={page}').status_code == (
+                HTTPStatus.OK)
+    assert len(keys) == 3, (
+        "Убедитесь, что ключ кэша ленты строится по проверенному номеру"
+        " страницы, а не по сырому значению из запроса."
+    )
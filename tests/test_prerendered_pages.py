@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from django.urls import reverse
+
+from pages.static_pages import build
+
+
+@pytest.fixture
+def built_pages(settings, tmp_path):
+    settings.STATIC_PAGES_ROOT = tmp_path
+    build()
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_prebuilt_page_skips_templates(built_pages, client,
+                                       django_assert_num_queries):
+    url = reverse('pages:about')
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response.templates == [], (
+        "Убедитесь, что собранная страница отдаётся без шаблонов."
+    )
+    assert 'О проекте' in response.content.decode()
+    assert 'max-age' in response['Cache-Control']
+    assert response['X-Frame-Options'] == 'DENY', (
+        "Убедитесь, что собранная страница защищена от встраивания"
+        " во фреймы."
+    )
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == 304, (
+        "Убедитесь, что собранная страница поддерживает ETag."
+    )
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.content) == response.content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_logged_in_users_get_rendered_page(built_pages, user_client, user):
+    response = user_client.get(reverse('pages:rules'))
+    assert 'pages/rules.html' in [t.name for t in response.templates], (
+        "Убедитесь, что залогиненные пользователи получают обычную"
+        " страницу со своим меню."
+    )
+    assert user.username in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_missing_build_falls_back(settings, tmp_path, client):
+    settings.STATIC_PAGES_ROOT = tmp_path
+    response = client.get(reverse('pages:about'))
+    assert 'pages/about.html' in [t.name for t in response.templates]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_etag_lists_and_encodings(built_pages, client):
+    url = reverse('pages:about')
+    etag = client.get(url)['ETag']
+    for header in (f'"other", {etag}', '*', f'W/{etag}'):
+        response = client.get(url, HTTP_IF_NONE_MATCH=header)
+        assert response.status_code == 304, (
+            "Убедитесь, что If-None-Match разбирается как список ETag."
+        )
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert compressed['ETag'] != etag, (
+        "Убедитесь, что у сжатой и несжатой страницы разные ETag."
+    )
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                          HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
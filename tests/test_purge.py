@@ -0,0 +1,125 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from django.db import transaction
+
+from blog import middleware, purge
+from blog.models import Comment, User
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.purges.append(json.loads(body)['tags'])
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def proxy(settings):
+    server = HTTPServer(('127.0.0.1', 0), PurgeHandler)
+    server.purges = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.BLOG_PURGE_URL = 'http://127.0.0.1:%d/purge' % server.server_port
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_responses_carry_surrogate_keys(client, post_with_published_location):
+    post = post_with_published_location
+    keys = client.get(f'/posts/{post.pk}/')['Surrogate-Key'].split()
+    assert f'post:{post.pk}' in keys
+    assert f'category:{post.category_id}' in keys
+    assert f'user:{post.author_id}' in keys, (
+        "Убедитесь, что ответ перечисляет в Surrogate-Key объекты,"
+        " от которых он зависит."
+    )
+    feed_keys = client.get(
+        f'/category/{post.category.slug}/rss/')['Surrogate-Key'].split()
+    assert f'feed:category:{post.category_id}' in feed_keys
+
+
+@pytest.mark.django_db(transaction=True)
+def test_changes_are_purged_in_one_batch(proxy, mixer, user,
+                                         post_with_published_location):
+    post = post_with_published_location
+    purge.wait()
+    proxy.purges.clear()
+    with transaction.atomic():
+        comment = mixer.blend(Comment, post=post, author=user)
+        post.title = 'Новый заголовок'
+        post.save()
+        assert proxy.purges == [], (
+            "Убедитесь, что сброс отправляется только после фиксации"
+            " транзакции."
+        )
+    purge.wait()
+    assert len(proxy.purges) == 1, (
+        "Убедитесь, что изменения одной транзакции сбрасываются"
+        " одним запросом."
+    )
+    tags = set(proxy.purges[0])
+    assert {f'post:{post.pk}', f'comment:{comment.pk}',
+            'feed:global:0', f'feed:author:{user.pk}'} <= tags
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_changes_are_not_purged(proxy, user,
+                                            post_with_published_location):
+    purge.wait()
+    proxy.purges.clear()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            post_with_published_location.save()
+            raise RuntimeError
+    purge.wait()
+    assert proxy.purges == [], (
+        "Убедитесь, что изменения отменённой транзакции не сбрасываются"
+        " сразу."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_long_surrogate_keys_are_collapsed(client, mixer, monkeypatch,
+                                           post_with_published_location):
+    post = post_with_published_location
+    for user in mixer.cycle(5).blend(User):
+        mixer.blend(Comment, post=post, author=user)
+    monkeypatch.setattr(middleware, 'SURROGATE_KEY_MAX_LENGTH', 60)
+    header = client.get(f'/posts/{post.pk}/')['Surrogate-Key']
+    keys = header.split()
+    assert len(header) <= 60, (
+        "Убедитесь, что длина заголовка Surrogate-Key ограничена."
+    )
+    assert f'post:{post.pk}' in keys and 'user:all' in keys
+    assert not any(key.startswith('comment:') for key in keys)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_purge_does_not_block_the_request(settings, monkeypatch,
+                                          post_with_published_location):
+    settings.BLOG_PURGE_URL = 'http://127.0.0.1:9/purge'
+    released = threading.Event()
+    sent = []
+
+    def slow_send(tags):
+        released.wait(5)
+        sent.append(tags)
+
+    monkeypatch.setattr(purge, 'send', slow_send)
+    post_with_published_location.save()
+    assert sent == [], (
+        "Убедитесь, что запрос к прокси не выполняется в потоке"
+        " обработки запроса."
+    )
+    released.set()
+    purge.wait()
+    assert f'post:{post_with_published_location.pk}' in sent[0]
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from blog.page_cache import get_or_compute
+
+N_THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _run_concurrently(target):
+    barrier = threading.Barrier(N_THREADS)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=worker) for _ in range(N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SlowCompute:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.3)
+        return self.value
+
+
+def test_single_recompute_on_empty_cache():
+    compute = SlowCompute('page')
+    results = _run_concurrently(
+        lambda: get_or_compute('page:test', 1, compute, 60))
+    assert compute.calls == 1, (
+        "Убедитесь, что при одновременных запросах страница"
+        " пересчитывается только один раз."
+    )
+    assert results == ['page'] * N_THREADS
+
+
+def test_stale_served_while_revalidating():
+    get_or_compute('page:test', 1, lambda: 'old', 60)
+    compute = SlowCompute('new')
+    results = _run_concurrently(
+        lambda: get_or_compute('page:test', 2, compute, 60))
+    assert compute.calls == 1, (
+        "Убедитесь, что устаревшая страница пересчитывается только"
+        " одним запросом."
+    )
+    assert results.count('new') == 1
+    assert results.count('old') == N_THREADS - 1, (
+        "Убедитесь, что пока страница пересчитывается, остальные запросы"
+        " получают её устаревшую версию."
+    )
+    assert get_or_compute('page:test', 2, compute, 60) == 'new'
+    assert compute.calls == 1
+
+
+def test_early_refresh_before_expiry():
+    get_or_compute('page:test', 1, lambda: 'old', 60)
+    entry = cache.get('page:test')
+    entry['expires'] = time.time() + 0.001
+    entry['delta'] = 100
+    cache.set('page:test', entry)
+    assert get_or_compute('page:test', 1, lambda: 'new', 60) == 'new', (
+        "Убедитесь, что значение, срок которого вот-вот истечёт,"
+        " обновляется заранее."
+    )
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+
+from blog.models import Comment
+from blog.static_site import build, target_file
+
+
+@pytest.fixture
+def site_root(settings, tmp_path):
+    settings.STATIC_SITE_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_full_build_writes_public_pages(site_root, user,
+                                        post_with_published_location,
+                                        posts_with_unpublished_category):
+    built, _ = build(workers=0)
+    post = post_with_published_location
+    for url in (reverse('blog:index'),
+                reverse('blog:post_detail', args=(post.pk,)),
+                reverse('blog:category_posts', args=(post.category.slug,)),
+                reverse('blog:profile', args=(post.author.username,))):
+        assert url in built, (
+            f"Убедитесь, что статическая сборка включает страницу `{url}`."
+        )
+        assert target_file(url).exists()
+        assert target_file(url).with_name('index.html.gz').exists()
+    hidden = posts_with_unpublished_category[0]
+    assert reverse('blog:post_detail', args=(hidden.pk,)) not in built, (
+        "Убедитесь, что неопубликованные посты не попадают в сборку."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_incremental_build_renders_only_affected_pages(
+        site_root, mixer, user, post_with_published_location,
+        post_with_another_category):
+    build(workers=0)
+    assert build(workers=0) == ([], []), (
+        "Убедитесь, что повторная сборка без изменений ничего"
+        " не перерисовывает."
+    )
+    post = post_with_published_location
+    mixer.blend(Comment, post=post, author=user)
+    built, _ = build(workers=0)
+    assert reverse('blog:post_detail', args=(post.pk,)) in built
+    assert reverse(
+        'blog:post_detail', args=(post_with_another_category.pk,)
+    ) not in built, (
+        "Убедитесь, что инкрементальная сборка перерисовывает только"
+        " затронутые страницы."
+    )
+
+    detail = reverse('blog:post_detail', args=(post.pk,))
+    post.delete()
+    _, removed = build(workers=0)
+    assert detail in removed
+    assert not target_file(detail).exists(), (
+        "Убедитесь, что страницы удалённых постов убираются из сборки."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pagination_links_point_to_built_pages(
+        site_root, many_posts_with_published_locations):
+    build(workers=0)
+    index = reverse('blog:index')
+    first = target_file(index).read_text()
+    second = target_file(f'{index}?page=2').read_text()
+    assert f'href="{index}page-2/"' in first, (
+        "Убедитесь, что ссылки пагинатора в сборке ведут на каталоги"
+        " page-N/."
+    )
+    assert '?page=' not in first + second
+    assert f'href="{index}"' in second
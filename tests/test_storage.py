@@ -0,0 +1,89 @@
+import hashlib
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog import image_refs
+from blog.deletion import purge_deleted, soft_delete_post
+from blog.models import Post, StoredImage
+
+
+def _image(color):
+    data = BytesIO()
+    Image.new('RGB', (10, 10), color=color).save(data, 'JPEG')
+    return data.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _references(name):
+    return StoredImage.objects.get(name=name).references
+
+
+def _age(storage, name):
+    hours_ago = time.time() - 2 * 60 * 60
+    os.utime(storage.path(name), (hours_ago, hours_ago))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_identical_uploads_are_stored_once(mixer, user):
+    content = _image('red')
+    first, second = (
+        mixer.blend(Post, author=user,
+                    image=SimpleUploadedFile(name, content))
+        for name in ('photo.JPG', 'copy.jpg'))
+    digest = hashlib.sha256(content).hexdigest()
+    name = f'posts_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+    assert first.image.name == second.image.name == name, (
+        "Убедитесь, что одинаковые картинки хранятся в одном файле"
+        " с именем из хэша содержимого."
+    )
+    assert _references(name) == 2
+
+    second.image = SimpleUploadedFile('other.jpg', _image('blue'))
+    second.save()
+    assert _references(name) == 1
+    assert _references(second.image.name) == 1
+
+    first.delete()
+    assert _references(name) == 0
+    assert first.image.storage.exists(name)
+
+    other_name = second.image.name
+    _age(second.image.storage, other_name)
+    soft_delete_post(second)
+    purge_deleted(pause=0)
+    assert not second.image.storage.exists(other_name), (
+        "Убедитесь, что очистка удаляет картинки без ссылок."
+    )
+    assert not StoredImage.objects.filter(name=other_name).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reupload_during_delete_keeps_file(mixer, user):
+    content = _image('green')
+    post = mixer.blend(Post, author=user,
+                       image=SimpleUploadedFile('photo.jpg', content))
+    storage, name = post.image.storage, post.image.name
+    _age(storage, name)
+    post.delete()
+    # Та же картинка загружается снова после того, как учётная запись
+    # удалена, но до удаления файла.
+    StoredImage.objects.filter(name=name).delete()
+    assert storage.save('posts_images/copy.jpg',
+                        SimpleUploadedFile('copy.jpg', content)) == name
+    assert image_refs.delete_unreferenced([name]) == set()
+    assert storage.exists(name), (
+        "Убедитесь, что файл, загруженный повторно во время удаления,"
+        " не удаляется."
+    )
+    _age(storage, name)
+    assert image_refs.delete_unreferenced([name]) == {name}
+    assert not storage.exists(name)
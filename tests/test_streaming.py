@@ -0,0 +1,72 @@
+import gzip
+import re
+
+import pytest
+from django.test import override_settings
+
+from blog.const import COMMENT_REPLIES_PER_PARENT, COMMENT_THREADS_PER_PAGE
+from blog.models import Comment
+from pages.static_pages import write_atomic
+
+
+def normalized(content):
+    content = re.sub(r'name="csrfmiddlewaretoken" value="\w+"', '', content)
+    return re.sub(r'\s+', ' ', content).strip()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_detail_page_is_streamed(user_client, mixer, user,
+                                 post_with_published_location):
+    post = post_with_published_location
+    # Полная страница ветвей, у каждой — все показываемые ответы.
+    roots = mixer.cycle(COMMENT_THREADS_PER_PAGE).blend(
+        Comment, post=post, author=user, text='Комментарий')
+    for root in roots:
+        mixer.cycle(COMMENT_REPLIES_PER_PARENT).blend(
+            Comment, post=post, author=user, parent=root,
+            text='Комментарий')
+    url = f'/posts/{post.pk}/'
+    regular = user_client.get(url).content.decode()
+    with override_settings(BLOG_STREAMING_DETAIL=True):
+        response = user_client.get(url)
+        assert response.streaming, (
+            "Убедитесь, что в потоковом режиме страница поста отдаётся"
+            " объектом StreamingHttpResponse."
+        )
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+    assert post.title in chunks[0]
+    assert 'Комментарий' not in chunks[0], (
+        "Убедитесь, что шапка и текст поста отправляются до комментариев."
+    )
+    assert len(chunks) == 4, (
+        "Убедитесь, что комментарии передаются пачками."
+    )
+    assert normalized(''.join(chunks)) == normalized(regular), (
+        "Убедитесь, что потоковая страница совпадает с обычной."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streamed_page_links_to_more_comments(client, mixer, user,
+                                              post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(COMMENT_THREADS_PER_PAGE + 5).blend(
+        Comment, post=post, author=user)
+    url = f'/posts/{post.pk}/'
+    assert 'Показать ещё комментарии' in client.get(url).content.decode()
+    with override_settings(BLOG_STREAMING_DETAIL=True):
+        content = b''.join(client.get(url).streaming_content).decode()
+    assert 'Показать ещё комментарии' in content, (
+        "Убедитесь, что потоковая страница поста ссылается на следующие"
+        " ветви комментариев."
+    )
+
+
+def test_write_atomic_streams_chunks(tmp_path):
+    target = tmp_path / 'page' / 'index.html'
+    write_atomic(target, iter([b'<html>', b'body', b'</html>']))
+    assert target.read_bytes() == b'<html>body</html>'
+    compressed = target.with_name('index.html.gz').read_bytes()
+    assert gzip.decompress(compressed) == b'<html>body</html>'
+    assert sorted(path.name for path in target.parent.iterdir()) == [
+        'index.html', 'index.html.gz']
@@ -0,0 +1,54 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template import defaultfilters
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_html_rendered_on_save(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    post.text = 'Строка <b>1</b>\nстрока 2'
+    post.save()
+    post.refresh_from_db()
+    assert post.text_html == 'Строка &lt;b&gt;1&lt;/b&gt;<br>строка 2', (
+        "Убедитесь, что HTML текста поста отрисовывается при сохранении."
+    )
+    comment = mixer.blend(Comment, post=post, author=user, text='a\nb')
+    comment.refresh_from_db()
+    assert comment.text_html == 'a<br>b'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_detail_page_skips_text_processing(user_client, mixer, user,
+                                           post_with_published_location,
+                                           monkeypatch):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post, author=user, text='a\n<i>b</i>')
+
+    def fail(value, autoescape=True):
+        raise AssertionError(
+            "Убедитесь, что при показе поста текст не обрабатывается"
+            " фильтром linebreaksbr."
+        )
+
+    monkeypatch.setitem(defaultfilters.register.filters, 'linebreaksbr', fail)
+    content = user_client.get(f'/posts/{post.pk}/').content.decode()
+    assert content.count('a<br>&lt;i&gt;b&lt;/i&gt;') == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_command(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post, author=user, text='x\ny')
+    Post.objects.update(text_html='')
+    Comment.objects.update(text_html='')
+    call_command('backfill_text_html', stdout=StringIO())
+    post.refresh_from_db()
+    comment.refresh_from_db()
+    assert post.text_html, (
+        "Убедитесь, что команда backfill_text_html заполняет HTML постов."
+    )
+    assert comment.text_html == 'x<br>y'
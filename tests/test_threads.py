@@ -0,0 +1,162 @@
+import pytest
+
+from blog import threads
+from blog.const import COMMENT_MAX_DEPTH, COMMENT_REPLIES_PER_PARENT
+from blog.models import Comment, Post
+
+
+@pytest.fixture
+def reply(mixer, user, post_with_published_location):
+    def create(parent=None):
+        return mixer.blend(Comment, post=post_with_published_location,
+                           author=user, parent=parent)
+
+    return create
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_is_in_display_order(reply, post_with_published_location,
+                                    django_assert_num_queries):
+    first = reply()
+    second = reply()
+    first_reply = reply(first)
+    nested = reply(first_reply)
+    with django_assert_num_queries(1):
+        comments = list(threads.thread(post_with_published_location.pk))
+    assert comments == [first, first_reply, nested, second], (
+        "Убедитесь, что ответы показываются сразу после комментария,"
+        " на который отвечают."
+    )
+    assert [comment.depth for comment in comments] == [0, 1, 2, 0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_depth_is_limited(reply):
+    comment = reply()
+    for _ in range(COMMENT_MAX_DEPTH + 2):
+        comment = reply(comment)
+    assert comment.depth == COMMENT_MAX_DEPTH, (
+        "Убедитесь, что ответы глубже предела становятся соседями"
+        " родителя."
+    )
+    assert comment.parent.depth == COMMENT_MAX_DEPTH - 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_keyset_pages_per_level(reply, post_with_published_location,
+                                django_assert_num_queries):
+    post_id = post_with_published_location.pk
+    roots = [reply() for _ in range(3)]
+    replies = [reply(roots[0]) for _ in range(3)]
+    nested = reply(replies[0])
+    with django_assert_num_queries(4):
+        comments, after, links = threads.page(post_id, limit=2, replies=2)
+        comments = list(comments)
+    assert comments == [roots[0], *replies[:2], roots[1]], (
+        "Убедитесь, что под каждой ветвью показываются только первые"
+        " ответы."
+    )
+    assert links == {
+        replies[0].pk: [threads.ReplyLink(replies[0].pk, '', 2)],
+        replies[1].pk: [threads.ReplyLink(roots[0].pk, replies[1].path, 1)],
+    }, (
+        "Убедитесь, что для непоказанных ответов есть ссылки."
+    )
+    comments, after, _ = threads.page(post_id, after=after, limit=2)
+    assert list(comments) == [roots[2]]
+    assert after is None
+
+    comments, after, _ = threads.page(post_id, parent=roots[0], limit=2)
+    assert list(comments) == [replies[0], nested, replies[1]]
+    comments, after, _ = threads.page(post_id, parent=roots[0], after=after,
+                                      limit=2)
+    assert list(comments) == replies[2:]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_more_comments_page(client, reply, post_with_published_location):
+    root = reply()
+    nested = reply(root)
+    response = client.get(
+        f'/posts/{root.post_id}/comments/?parent={root.pk}')
+    assert response.status_code == 200
+    assert f'comment_{nested.pk}"' in response.content.decode()
+    response = client.get(
+        f'/posts/{root.post_id}/comments/?after={root.path}')
+    assert f'comment_{root.pk}"' not in response.content.decode(), (
+        "Убедитесь, что следующая страница начинается после курсора."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_page_links_to_more_replies(client, reply,
+                                         post_with_published_location):
+    root = reply()
+    replies = [reply(root) for _ in range(COMMENT_REPLIES_PER_PARENT + 2)]
+    content = client.get(f'/posts/{root.post_id}/').content.decode()
+    shown = replies[:COMMENT_REPLIES_PER_PARENT]
+    assert all(f'comment_{comment.pk}"' in content for comment in shown)
+    assert f'comment_{replies[-1].pk}"' not in content
+    link = (f'/posts/{root.post_id}/comments/?parent={root.pk}'
+            f'&amp;after={shown[-1].path}')
+    assert link in content, (
+        "Убедитесь, что под ветвью есть ссылка на остальные ответы."
+    )
+    content = client.get(link.replace('&amp;', '&')).content.decode()
+    assert all(f'comment_{comment.pk}"' in content
+               for comment in replies[COMMENT_REPLIES_PER_PARENT:])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reply_view(user_client, reply):
+    parent = reply()
+    assert user_client.get(f'/comments/{parent.pk}/reply/').status_code == 200
+    response = user_client.post(f'/comments/{parent.pk}/reply/',
+                                {'text': 'Ответ'})
+    assert response.status_code == 302
+    created = Comment.objects.get(text='Ответ')
+    assert created.parent == parent
+    assert created.post_id == parent.post_id
+    assert created.path.startswith(parent.path)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_removes_subtree(user_client, reply,
+                                post_with_published_location):
+    root = reply()
+    kept = reply()
+    child = reply(root)
+    reply(child)
+    generation = Post.objects.get(
+        pk=post_with_published_location.pk).comments_generation
+    response = user_client.post(
+        f'/posts/{root.post_id}/delete_comment/{root.pk}')
+    assert response.status_code == 302
+    assert list(Comment.objects.all()) == [kept], (
+        "Убедитесь, что при удалении комментария удаляются и все ответы"
+        " на него."
+    )
+    assert Post.objects.get(
+        pk=post_with_published_location.pk).comments_generation > generation
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_subtree_without_paths(user, post_with_published_location):
+    post = post_with_published_location
+
+    def bulk(parent=None):
+        # bulk_create не вызывает save() и не заполняет путь.
+        Comment.objects.bulk_create([Comment(
+            post=post, author=user, text='Текст', parent=parent)])
+        return Comment.objects.order_by('-pk').first()
+
+    root = bulk()
+    kept = bulk()
+    grandchild = bulk(bulk(root))
+    assert not root.path
+    threads.delete_subtree(root)
+    assert list(Comment.objects.all()) == [kept], (
+        "Убедитесь, что без путей удаляется вся ветка комментария,"
+        " найденная по parent."
+    )
+    assert Comment.all_objects.get(pk=grandchild.pk).deleted_at is not None
@@ -0,0 +1,70 @@
+import importlib
+import sys
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from blogicum.warmup import warm_up
+
+
+def load_production_settings():
+    sys.modules.pop('blogicum.settings_production', None)
+    return importlib.import_module('blogicum.settings_production')
+
+
+def test_production_settings(monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'production-secret')
+    monkeypatch.setenv('DJANGO_CACHE_LOCATION', '127.0.0.1:11211')
+    production = load_production_settings()
+    assert production.DEBUG is False
+    assert 'debug_toolbar' not in production.INSTALLED_APPS
+    loaders = production.TEMPLATES[0]['OPTIONS']['loaders']
+    assert loaders[0][0] == 'django.template.loaders.cached.Loader', (
+        "Убедитесь, что в боевых настройках шаблоны загружаются"
+        " кэширующим загрузчиком."
+    )
+    assert production.CACHES['default']['BACKEND'].endswith(
+        'PyMemcacheCache'), (
+        "Убедитесь, что в боевых настройках кэш общий для процессов."
+    )
+
+
+def test_production_settings_refuse_local_cache(monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'production-secret')
+    monkeypatch.delenv('DJANGO_CACHE_LOCATION', raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        load_production_settings()
+
+
+def test_production_settings_keep_jinja2(monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'production-secret')
+    monkeypatch.setenv('DJANGO_CACHE_LOCATION', '127.0.0.1:11211')
+    monkeypatch.setenv('DJANGO_BLOG_JINJA2', '1')
+    production = load_production_settings()
+    assert production.BLOG_JINJA2 is True
+    backends = [engine['BACKEND'] for engine in production.TEMPLATES]
+    assert 'django.template.backends.jinja2.Jinja2' in backends, (
+        "Убедитесь, что боевые настройки сохраняют движок Jinja2."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_up_compiles_all_templates(settings):
+    templates = warm_up()
+    for name in ('base.html', 'includes/post_card.html',
+                 'includes/comments.html', 'blog/index.html'):
+        assert name in templates, (
+            f"Убедитесь, что прогрев компилирует шаблон `{name}`."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_up_compiles_jinja2_templates(settings):
+    pytest.importorskip('jinja2')
+    settings.BLOG_JINJA2 = True
+    templates = warm_up()
+    for name in ('blog/index.html', 'includes/post_card.html'):
+        assert f'jinja2:{name}' in templates, (
+            f"Убедитесь, что прогрев компилирует шаблон Jinja2 `{name}`."
+        )